@@ -1,19 +1,26 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Body
+from fastapi import FastAPI, File, UploadFile, HTTPException, Body, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 import os
 from dotenv import load_dotenv
 import uuid
-import io
+import hashlib
 import json
+import math
 import pandas as pd
 import numpy as np
+import msgpack
 from scipy import stats
 import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from routes.statistical_tests import router as statistical_tests_router
 from routes.regression import router as regression_router
+from services.file_store import get_file, get_column, put_file
 
 # Load environment variables
 load_dotenv()
@@ -56,21 +63,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses (analysis JSON repeats column names heavily)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Include statistical tests router
 app.include_router(statistical_tests_router)
 
 # Include regression router
 app.include_router(regression_router)
 
+# Static files with long-lived caching (Vite emits content-hashed filenames under /assets)
+class CachedStaticFiles(StaticFiles):
+    async def get_response(self, path, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
 # Mount static files from frontend build
 static_dir = Path(__file__).parent.parent / "frontend" / "dist"
 if static_dir.exists():
     # Mount static assets (JS, CSS, images, etc.)
-    app.mount("/assets", StaticFiles(directory=str(static_dir / "assets")), name="assets")
+    app.mount("/assets", CachedStaticFiles(directory=str(static_dir / "assets")), name="assets")
     logger.info(f"Mounted static files from {static_dir}")
 
-# In-memory storage for uploaded files (in production, use database or file storage)
-uploaded_files = {}
+# Shared process pool for CPU-bound per-column analyses, created on first use
+PARALLEL_MIN_VALUES = int(os.getenv('PARALLEL_MIN_VALUES', 200000))
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+def get_process_pool():
+    """Return the shared process pool, creating it if needed"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        return _process_pool
+
+def discard_process_pool(pool):
+    """Drop a broken process pool so the next request starts a fresh one"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+@app.on_event("shutdown")
+def shutdown_process_pool():
+    """Stop worker processes when the server shuts down"""
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+
+# In-memory storage for uploaded files lives in services.file_store (LRU-bounded;
+# in production, use database or file storage)
+
+def replace_inf_inplace(df):
+    """Replace +/-Inf with NaN in float columns without copying the dataframe"""
+    for col in df.select_dtypes(include=[np.floating]).columns:
+        values = df[col].to_numpy(copy=False)
+        inf_mask = np.isinf(values)
+        if inf_mask.any():
+            df.loc[inf_mask, col] = np.nan
 
 @app.get("/api/health")
 async def health_check():
@@ -113,17 +166,11 @@ async def load_sample_data(filename: str):
         raise HTTPException(status_code=400, detail="Invalid file type")
 
     try:
-        # Read the file
-        with open(file_path, 'rb') as f:
-            contents = f.read()
-
-        file_obj = io.BytesIO(contents)
-
-        # Load dataframe based on file type
+        # Load dataframe based on file type (readers stream from disk)
         if filename.endswith('.csv'):
-            df = pd.read_csv(file_obj)
+            df = pd.read_csv(file_path)
         else:
-            df = pd.read_excel(file_obj)
+            df = pd.read_excel(file_path)
 
         # Validate dataframe
         if df.empty:
@@ -132,20 +179,19 @@ async def load_sample_data(filename: str):
         if len(df.columns) == 0:
             raise HTTPException(status_code=400, detail="File has no columns")
 
-        # Replace NaN and Inf values for JSON serialization
-        df = df.replace([np.inf, -np.inf], np.nan)
-        df = df.where(pd.notna(df), None)
+        # Replace Inf values with NaN (serializers map NaN to null)
+        replace_inf_inplace(df)
 
         # Generate file ID
         file_id = str(uuid.uuid4())
 
         # Store file info
-        uploaded_files[file_id] = {
+        put_file(file_id, {
             'dataframe': df,
             'filename': filename,
             'rows': len(df),
             'columns': list(df.columns),
-        }
+        })
 
         # Prepare preview (first 5 and last 5 rows)
         if len(df) <= 10:
@@ -201,9 +247,9 @@ async def upload_file(file: UploadFile = File(...)):
             logger.error(f"Invalid file type: {file.filename}")
             raise HTTPException(status_code=400, detail="Only CSV and Excel files are supported")
 
-        # Read file into memory
-        contents = await file.read()
-        file_obj = io.BytesIO(contents)
+        # Parse straight from the spooled upload instead of copying it into memory first
+        file_obj = file.file
+        file_obj.seek(0)
 
         # Load dataframe based on file type
         if file.filename.endswith('.csv'):
@@ -218,20 +264,19 @@ async def upload_file(file: UploadFile = File(...)):
         if len(df.columns) == 0:
             raise HTTPException(status_code=400, detail="File has no columns")
 
-        # Replace NaN and Inf values for JSON serialization
-        df = df.replace([np.inf, -np.inf], np.nan)
-        df = df.where(pd.notna(df), None)
+        # Replace Inf values with NaN (serializers map NaN to null)
+        replace_inf_inplace(df)
 
         # Generate file ID
         file_id = str(uuid.uuid4())
 
         # Store file info
-        uploaded_files[file_id] = {
+        put_file(file_id, {
             'dataframe': df,
             'filename': file.filename,
             'rows': len(df),
             'columns': list(df.columns),
-        }
+        })
 
         # Prepare preview (first 5 and last 5 rows) - convert to safe JSON-serializable format
         if len(df) <= 10:
@@ -276,7 +321,7 @@ async def upload_file(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
 
 @app.post("/api/analyze")
-async def analyze_data(request_data: dict = Body(...)):
+def analyze_data(request: Request, request_data: dict = Body(...)):
     """Perform statistical analysis on uploaded data"""
     try:
         logger.info(f"Analyze request: {request_data}")
@@ -286,10 +331,11 @@ async def analyze_data(request_data: dict = Body(...)):
         columns = request_data.get('columns', [])
 
         # Validate file_id
-        if file_id not in uploaded_files:
+        file_entry = get_file(file_id)
+        if file_entry is None:
             raise HTTPException(status_code=404, detail="File not found")
 
-        df = uploaded_files[file_id]['dataframe']
+        df = file_entry['dataframe']
 
         # Validate columns
         if not columns:
@@ -301,13 +347,32 @@ async def analyze_data(request_data: dict = Body(...)):
         if not numeric_columns:
             raise HTTPException(status_code=400, detail="No valid numeric columns found")
 
+        # Pull each column as a float64 array (zero-copy for float columns)
+        columns_data = {col: get_column(file_id, col, dtype=np.float64) for col in numeric_columns}
+
+        # Clients that accept msgpack get the correlation matrix as a packed float32 buffer
+        if analysis_type == 'correlation' and "application/msgpack" in request.headers.get("accept", ""):
+            corr_matrix = compute_correlation_matrix(columns_data)
+            payload = msgpack.packb({
+                "analysis_type": analysis_type,
+                "columns_analyzed": numeric_columns,
+                "results": {
+                    "columns": list(columns_data),
+                    "matrix": corr_matrix.astype('<f4').tobytes(),
+                    "dtype": "float32",
+                    "shape": list(corr_matrix.shape),
+                }
+            }, use_bin_type=True)
+            logger.info(f"Analysis completed: {analysis_type} for {len(numeric_columns)} columns (msgpack)")
+            return Response(content=payload, media_type="application/msgpack")
+
         # Perform analysis based on type
         if analysis_type == 'descriptive':
-            results = perform_descriptive_analysis(df, numeric_columns)
+            results = perform_descriptive_analysis(columns_data)
         elif analysis_type == 'correlation':
-            results = perform_correlation_analysis(df, numeric_columns)
+            results = perform_correlation_analysis(columns_data)
         elif analysis_type == 'distribution':
-            results = perform_distribution_analysis(df, numeric_columns)
+            results = perform_distribution_analysis(columns_data)
         else:
             raise HTTPException(status_code=400, detail=f"Unknown analysis type: {analysis_type}")
 
@@ -327,72 +392,112 @@ async def analyze_data(request_data: dict = Body(...)):
 
 def safe_float(val):
     """Convert value to float, handling NaN and Inf"""
-    if pd.isna(val) or np.isnan(val):
-        return None
-    if np.isinf(val):
-        return None
-    return float(val)
+    val = float(val)
+    return val if math.isfinite(val) else None
+
+def safe_float_list(values):
+    """Vectorized safe_float: float array to list with NaN/Inf mapped to None"""
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(np.isfinite(values), values, None).tolist()
 
-def perform_descriptive_analysis(df, columns):
+def perform_descriptive_analysis(columns_data):
     """Calculate descriptive statistics"""
     results = {}
-    for col in columns:
-        col_data = df[col].dropna()
+    for col, values in columns_data.items():
+        col_data = values[~np.isnan(values)]
         if len(col_data) == 0:
             continue
+        q25, q50, q75 = np.quantile(col_data, [0.25, 0.50, 0.75])
+        std = col_data.std(ddof=1) if len(col_data) > 1 else np.nan
+        mean, std, min_, q25, q50, q75, max_ = safe_float_list(
+            [col_data.mean(), std, col_data.min(), q25, q50, q75, col_data.max()]
+        )
         results[col] = {
-            "count": int(col_data.count()),
-            "mean": safe_float(col_data.mean()),
-            "std": safe_float(col_data.std()),
-            "min": safe_float(col_data.min()),
-            "25%": safe_float(col_data.quantile(0.25)),
-            "50%": safe_float(col_data.quantile(0.50)),
-            "75%": safe_float(col_data.quantile(0.75)),
-            "max": safe_float(col_data.max()),
+            "count": int(len(col_data)),
+            "mean": mean,
+            "std": std,
+            "min": min_,
+            "25%": q25,
+            "50%": q50,
+            "75%": q75,
+            "max": max_,
         }
     return results
 
-def perform_correlation_analysis(df, columns):
-    """Calculate correlation matrix"""
-    subset = df[columns].select_dtypes(include=[np.number])
-    corr_matrix = subset.corr().fillna(0)
+def compute_correlation_matrix(columns_data):
+    """Pairwise-complete Pearson correlation matrix, with NaN replaced by 0"""
+    corr_matrix = pd.DataFrame(columns_data, copy=False).corr().to_numpy()
+    np.nan_to_num(corr_matrix, copy=False)
+    return corr_matrix
 
-    # Convert to safe dict
-    corr_dict = {}
-    for col in corr_matrix.columns:
-        corr_dict[str(col)] = {}
-        for idx, val in corr_matrix[col].items():
-            corr_dict[str(col)][str(idx)] = safe_float(val)
+def perform_correlation_analysis(columns_data):
+    """Calculate correlation matrix"""
+    columns = list(columns_data)
+    corr_matrix = compute_correlation_matrix(columns_data)
 
+    # Labels once plus a row-major matrix: matrix[i][j] pairs columns[i] and columns[j]
     results = {
-        "correlation_matrix": corr_dict,
         "columns": columns,
+        "matrix": corr_matrix.tolist(),
     }
     return results
 
-def perform_distribution_analysis(df, columns):
+def _distribution_for_column(values):
+    """Distribution statistics for one float64 column (runs in a worker process)"""
+    col_data = values[~np.isnan(values)]
+    if len(col_data) < 3:  # Shapiro-Wilk requires at least 3 samples
+        return None
+
+    # Perform Shapiro-Wilk test for normality (sample up to 5000 points)
+    if len(col_data) > 5000:
+        sample_data = np.random.default_rng().choice(col_data, 5000, replace=False)
+    else:
+        sample_data = col_data
+    _, p_value = stats.shapiro(sample_data)
+
+    return {
+        "skewness": safe_float(stats.skew(col_data)),
+        "kurtosis": safe_float(stats.kurtosis(col_data)),
+        "shapiro_p_value": safe_float(p_value),
+        "is_normal": bool(p_value > 0.05),
+    }
+
+def perform_distribution_analysis(columns_data):
     """Analyze data distribution"""
-    results = {}
-    for col in columns:
-        col_data = df[col].dropna()
-        if len(col_data) < 3:  # Shapiro-Wilk requires at least 3 samples
-            continue
+    # Small inputs are faster inline than shipped to worker processes
+    total_values = sum(len(values) for values in columns_data.values())
+    if len(columns_data) > 1 and total_values >= PARALLEL_MIN_VALUES and (os.cpu_count() or 1) > 1:
+        pool = get_process_pool()
+        try:
+            futures = {col: pool.submit(_distribution_for_column, np.ascontiguousarray(values))
+                       for col, values in columns_data.items()}
+        except BrokenProcessPool:
+            discard_process_pool(pool)
+            futures = None
+    else:
+        futures = None
 
+    results = {}
+    for col, values in columns_data.items():
         try:
-            # Perform Shapiro-Wilk test for normality (sample up to 5000 points)
-            sample_data = col_data.sample(min(5000, len(col_data)))
-            _, p_value = stats.shapiro(sample_data)
-
-            results[col] = {
-                "skewness": safe_float(stats.skew(col_data)),
-                "kurtosis": safe_float(stats.kurtosis(col_data)),
-                "shapiro_p_value": safe_float(p_value),
-                "is_normal": bool(p_value > 0.05),
-            }
+            col_result = None
+            if futures is not None:
+                try:
+                    col_result = futures[col].result()
+                except BrokenProcessPool:
+                    # A worker died (e.g. killed for memory): replace the pool and finish inline
+                    logger.warning("Process pool broke during distribution analysis; recreating it")
+                    discard_process_pool(pool)
+                    futures = None
+            if futures is None:
+                col_result = _distribution_for_column(values)
         except Exception as e:
             logger.warning(f"Could not analyze distribution for {col}: {str(e)}")
             continue
 
+        if col_result is not None:
+            results[col] = col_result
+
     return results
 
 def is_date_type(series):
@@ -694,10 +799,11 @@ async def analyze_variables(file_id: str):
     """Analyze variables and detect data types"""
     try:
         # Validate file_id
-        if file_id not in uploaded_files:
+        file_entry = get_file(file_id)
+        if file_entry is None:
             raise HTTPException(status_code=404, detail="File not found")
 
-        df = uploaded_files[file_id]['dataframe']
+        df = file_entry['dataframe']
         total_rows = len(df)
 
         variables = []
@@ -772,10 +878,11 @@ async def get_summary_statistics(file_id: str, request_data: dict = Body(...)):
     """Get summary statistics for each variable based on its type"""
     try:
         # Validate file_id
-        if file_id not in uploaded_files:
+        file_entry = get_file(file_id)
+        if file_entry is None:
             raise HTTPException(status_code=404, detail="File not found")
 
-        df = uploaded_files[file_id]['dataframe']
+        df = file_entry['dataframe']
 
         # Get variables with their types from request
         variables = request_data.get('variables', [])
@@ -834,10 +941,11 @@ async def get_single_variable_summary(file_id: str, variable_name: str, request_
     """Get summary statistics for a single variable - optimized for single-variable updates"""
     try:
         # Validate file_id
-        if file_id not in uploaded_files:
+        file_entry = get_file(file_id)
+        if file_entry is None:
             raise HTTPException(status_code=404, detail="File not found")
 
-        df = uploaded_files[file_id]['dataframe']
+        df = file_entry['dataframe']
 
         # Validate variable exists
         if variable_name not in df.columns:
@@ -881,17 +989,6 @@ async def get_single_variable_summary(file_id: str, variable_name: str, request_
         logger.error(f"Error computing single variable summary: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Error computing summary: {str(e)}")
 
-@app.get("/favicon.svg")
-async def favicon_svg():
-    """Serve the favicon SVG"""
-    static_dir = Path(__file__).parent.parent / "frontend" / "dist"
-    favicon_file = static_dir / "favicon.svg"
-
-    if favicon_file.exists():
-        return FileResponse(str(favicon_file), media_type="image/svg+xml")
-    else:
-        raise HTTPException(status_code=404, detail="Favicon not found")
-
 # ==================== LEGACY: Plotly visualization functions removed ====================
 # These functions have been replaced with client-side Recharts rendering
 # The /api/visualize endpoint has been removed in favor of /api/data endpoint
@@ -904,10 +1001,11 @@ async def favicon_svg():
 async def get_raw_data(file_id: str):
     """Get raw dataframe as JSON for client-side visualization with Recharts"""
     try:
-        if file_id not in uploaded_files:
+        file_entry = get_file(file_id)
+        if file_entry is None:
             raise HTTPException(status_code=404, detail="File not found")
 
-        df = uploaded_files[file_id]['dataframe']
+        df = file_entry['dataframe']
 
         # Create a copy and clean NaN/Inf values
         df_clean = df.copy()
@@ -960,35 +1058,74 @@ async def get_raw_data(file_id: str):
 
 # ==================== STATIC FILE SERVING ====================
 
+class PrebuiltResponse(Response):
+    """Response built once at import time and returned for every request"""
+    async def __call__(self, scope, receive, send):
+        # Middleware (CORS, GZip) edits the header list in place, so each request gets a copy
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": list(self.raw_headers),
+        })
+        await send({"type": "http.response.body", "body": self.body})
+
+def prebuild_file_responses(file_path, media_type, cache_control):
+    """Read a static file once and return its (200, 304) responses, or None if missing"""
+    if not file_path.exists():
+        return None
+
+    content = file_path.read_bytes()
+    headers = {
+        "Cache-Control": cache_control,
+        "ETag": f'"{hashlib.md5(content).hexdigest()}"',
+    }
+    return (
+        PrebuiltResponse(content=content, media_type=media_type, headers=headers),
+        PrebuiltResponse(status_code=304, headers=headers),
+    )
+
+def serve_prebuilt(request, responses):
+    """Pick the full or Not Modified response based on If-None-Match"""
+    full_response, not_modified = responses
+    if request.headers.get("if-none-match") == full_response.headers["etag"]:
+        return not_modified
+    return full_response
+
+# index.html must be revalidated (it points at the current hashed bundles); the favicon rarely changes
+FAVICON_RESPONSES = prebuild_file_responses(
+    static_dir / "favicon.svg", "image/svg+xml", "public, max-age=31536000, immutable"
+)
+INDEX_RESPONSES = prebuild_file_responses(static_dir / "index.html", "text/html", "no-cache")
+
+@app.get("/favicon.svg")
+async def favicon_svg(request: Request):
+    """Serve the favicon SVG"""
+    if FAVICON_RESPONSES is None:
+        raise HTTPException(status_code=404, detail="Favicon not found")
+    return serve_prebuilt(request, FAVICON_RESPONSES)
+
 @app.get("/favicon.ico")
-async def favicon_ico():
+async def favicon_ico(request: Request):
     """Serve favicon.ico (redirect to SVG)"""
-    static_dir = Path(__file__).parent.parent / "frontend" / "dist"
-    favicon_file = static_dir / "favicon.svg"
-
-    if favicon_file.exists():
-        return FileResponse(str(favicon_file), media_type="image/svg+xml")
-    else:
+    if FAVICON_RESPONSES is None:
         raise HTTPException(status_code=404, detail="Favicon not found")
+    return serve_prebuilt(request, FAVICON_RESPONSES)
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Serve the frontend application"""
-    static_dir = Path(__file__).parent.parent / "frontend" / "dist"
-    index_file = static_dir / "index.html"
+    if INDEX_RESPONSES is not None:
+        return serve_prebuilt(request, INDEX_RESPONSES)
 
-    if index_file.exists():
-        return FileResponse(str(index_file))
-    else:
-        # Fallback to API info if frontend not built
-        return {
-            "message": "Medstat API",
-            "endpoints": {
-                "health": "/api/health",
-                "upload": "/api/upload",
-                "analyze": "/api/analyze",
-            }
+    # Fallback to API info if frontend not built
+    return {
+        "message": "Medstat API",
+        "endpoints": {
+            "health": "/api/health",
+            "upload": "/api/upload",
+            "analyze": "/api/analyze",
         }
+    }
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Dict, List, Any
-import pandas as pd
+from typing import Dict, List, Any, Literal
+from services.file_store import get_file
 from services.regression_runner import (
     run_linear_regression,
     run_logistic_regression
@@ -13,25 +13,22 @@ router = APIRouter(prefix="/api/regression", tags=["regression"])
 class RegressionRequest(BaseModel):
     file_id: str
     variables: Dict[str, Any]  # {dependent: str, independent: List[str]}
+    precision: Literal['float64', 'float32'] = 'float64'  # float32 trades accuracy for speed on large data
 
 # Helper function to load file data
-def load_file_data(file_id: str):
-    """Load data from uploaded file in memory"""
-    from app import uploaded_files
-
-    if file_id not in uploaded_files:
+def load_file_data(file_id: str, columns: List[str]):
+    """Load an uploaded dataframe, checking that the requested columns exist"""
+    file_entry = get_file(file_id)
+    if file_entry is None:
         raise HTTPException(status_code=404, detail=f"File {file_id} not found")
 
-    # Get dataframe and convert to list of dicts for processing
-    df = uploaded_files[file_id]['dataframe']
-
-    # Replace NaN with None for JSON serialization
-    df = df.where(pd.notna(df), None)
-
-    # Convert to list of dictionaries
-    data = df.to_dict('records')
+    df = file_entry['dataframe']
+    for col in columns:
+        if col not in df.columns:
+            raise HTTPException(status_code=404, detail=f"Variable '{col}' not found")
 
-    return data
+    # The stored dataframe is shared: regression runners only read the columns they need
+    return df
 
 @router.post("/linear")
 async def linear_regression(request: RegressionRequest):
@@ -46,8 +43,8 @@ async def linear_regression(request: RegressionRequest):
         if not independent_vars or len(independent_vars) == 0:
             raise HTTPException(status_code=400, detail='Missing required variables: independent (at least one)')
 
-        file_data = load_file_data(request.file_id)
-        results = run_linear_regression(file_data, dependent_var, independent_vars)
+        file_data = load_file_data(request.file_id, [dependent_var, *independent_vars])
+        results = run_linear_regression(file_data, dependent_var, independent_vars, request.precision)
 
         return results
     except HTTPException:
@@ -68,7 +65,7 @@ async def logistic_regression(request: RegressionRequest):
         if not independent_vars or len(independent_vars) == 0:
             raise HTTPException(status_code=400, detail='Missing required variables: independent (at least one)')
 
-        file_data = load_file_data(request.file_id)
+        file_data = load_file_data(request.file_id, [dependent_var, *independent_vars])
         results = run_logistic_regression(file_data, dependent_var, independent_vars)
 
         return results
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import Dict, Any
-import pandas as pd
+from typing import Dict, List, Any, Literal
+from services.file_store import get_file
 from pathlib import Path
 import json
 from services.test_runner import (
@@ -14,35 +15,45 @@ from services.test_runner import (
     run_chi_square,
     run_pearson_correlation,
     run_spearman_correlation,
-    run_kendall_correlation
+    run_kendall_correlation,
+    run_correlations_matrix,
+    run_all,
+    TESTS
 )
 
-router = APIRouter(prefix="/api/statistical-tests", tags=["statistical-tests"])
+# Test results are plain JSON-ready dicts, serialized with orjson
+router = APIRouter(prefix="/api/statistical-tests", tags=["statistical-tests"], default_response_class=ORJSONResponse)
 
 # Request models
 class StatisticalTestRequest(BaseModel):
     file_id: str
     variables: Dict[str, str]
 
-# Helper function to load file data
-# Import from app to access uploaded_files dictionary
-def load_file_data(file_id: str):
-    """Load data from uploaded file in memory"""
-    from app import uploaded_files
-
-    if file_id not in uploaded_files:
-        raise HTTPException(status_code=404, detail=f"File {file_id} not found")
+class RunAllRequest(BaseModel):
+    file_id: str
+    tests: List[Dict[str, Any]]  # [{test: str, variables: Dict[str, str]}]
 
-    # Get dataframe and convert to list of dicts for processing
-    df = uploaded_files[file_id]['dataframe']
+class CorrelationMatrixRequest(BaseModel):
+    file_id: str
+    columns: List[str]
+    method: Literal['pearson', 'spearman', 'kendall'] = 'pearson'
+    precision: Literal['float64', 'float32'] = 'float64'  # float32 trades accuracy for speed on large data
 
-    # Replace NaN with None for JSON serialization
-    df = df.where(pd.notna(df), None)
+# Helper function to load file data
+def load_file_data(file_id: str, columns: List[str]):
+    """Load an uploaded dataframe, checking that the requested columns exist"""
+    file_entry = get_file(file_id)
+    if file_entry is None:
+        raise HTTPException(status_code=404, detail=f"File {file_id} not found")
 
-    # Convert to list of dictionaries
-    data = df.to_dict('records')
+    df = file_entry['dataframe']
+    for col in columns:
+        if col not in df.columns:
+            raise HTTPException(status_code=404, detail=f"Variable '{col}' not found")
 
-    return data
+    # The stored dataframe is shared (runners only read it), so per-column work cached
+    # against it in the test runner is reused by later requests on the same upload
+    return df
 
 @router.post("/ttest")
 async def ttest(request: StatisticalTestRequest):
@@ -51,7 +62,7 @@ async def ttest(request: StatisticalTestRequest):
         if not request.variables.get('numeric') or not request.variables.get('categorical'):
             raise HTTPException(status_code=400, detail='Missing required variables: numeric and categorical')
 
-        file_data = load_file_data(request.file_id)
+        file_data = load_file_data(request.file_id, [request.variables['numeric'], request.variables['categorical']])
         results = run_ttest(file_data, request.variables['numeric'], request.variables['categorical'])
 
         return results
@@ -67,7 +78,7 @@ async def paired_ttest(request: StatisticalTestRequest):
         if not request.variables.get('var1') or not request.variables.get('var2'):
             raise HTTPException(status_code=400, detail='Missing required variables: var1 and var2')
 
-        file_data = load_file_data(request.file_id)
+        file_data = load_file_data(request.file_id, [request.variables['var1'], request.variables['var2']])
         results = run_paired_ttest(file_data, request.variables['var1'], request.variables['var2'])
 
         return results
@@ -83,7 +94,7 @@ async def anova(request: StatisticalTestRequest):
         if not request.variables.get('numeric') or not request.variables.get('categorical'):
             raise HTTPException(status_code=400, detail='Missing required variables: numeric and categorical')
 
-        file_data = load_file_data(request.file_id)
+        file_data = load_file_data(request.file_id, [request.variables['numeric'], request.variables['categorical']])
         results = run_anova(file_data, request.variables['numeric'], request.variables['categorical'])
 
         return results
@@ -99,7 +110,7 @@ async def mann_whitney(request: StatisticalTestRequest):
         if not request.variables.get('numeric') or not request.variables.get('categorical'):
             raise HTTPException(status_code=400, detail='Missing required variables: numeric and categorical')
 
-        file_data = load_file_data(request.file_id)
+        file_data = load_file_data(request.file_id, [request.variables['numeric'], request.variables['categorical']])
         results = run_mann_whitney(file_data, request.variables['numeric'], request.variables['categorical'])
 
         return results
@@ -115,7 +126,7 @@ async def wilcoxon_signed_rank(request: StatisticalTestRequest):
         if not request.variables.get('var1') or not request.variables.get('var2'):
             raise HTTPException(status_code=400, detail='Missing required variables: var1 and var2')
 
-        file_data = load_file_data(request.file_id)
+        file_data = load_file_data(request.file_id, [request.variables['var1'], request.variables['var2']])
         results = run_wilcoxon_signed_rank(file_data, request.variables['var1'], request.variables['var2'])
 
         return results
@@ -131,7 +142,7 @@ async def kruskal_wallis(request: StatisticalTestRequest):
         if not request.variables.get('numeric') or not request.variables.get('categorical'):
             raise HTTPException(status_code=400, detail='Missing required variables: numeric and categorical')
 
-        file_data = load_file_data(request.file_id)
+        file_data = load_file_data(request.file_id, [request.variables['numeric'], request.variables['categorical']])
         results = run_kruskal_wallis(file_data, request.variables['numeric'], request.variables['categorical'])
 
         return results
@@ -147,7 +158,7 @@ async def chi_square(request: StatisticalTestRequest):
         if not request.variables.get('var1') or not request.variables.get('var2'):
             raise HTTPException(status_code=400, detail='Missing required variables: var1 and var2')
 
-        file_data = load_file_data(request.file_id)
+        file_data = load_file_data(request.file_id, [request.variables['var1'], request.variables['var2']])
         results = run_chi_square(file_data, request.variables['var1'], request.variables['var2'])
 
         return results
@@ -163,7 +174,7 @@ async def pearson_correlation(request: StatisticalTestRequest):
         if not request.variables.get('var1') or not request.variables.get('var2'):
             raise HTTPException(status_code=400, detail='Missing required variables: var1 and var2')
 
-        file_data = load_file_data(request.file_id)
+        file_data = load_file_data(request.file_id, [request.variables['var1'], request.variables['var2']])
         results = run_pearson_correlation(file_data, request.variables['var1'], request.variables['var2'])
 
         return results
@@ -179,7 +190,7 @@ async def spearman_correlation(request: StatisticalTestRequest):
         if not request.variables.get('var1') or not request.variables.get('var2'):
             raise HTTPException(status_code=400, detail='Missing required variables: var1 and var2')
 
-        file_data = load_file_data(request.file_id)
+        file_data = load_file_data(request.file_id, [request.variables['var1'], request.variables['var2']])
         results = run_spearman_correlation(file_data, request.variables['var1'], request.variables['var2'])
 
         return results
@@ -195,7 +206,7 @@ async def kendall_correlation(request: StatisticalTestRequest):
         if not request.variables.get('var1') or not request.variables.get('var2'):
             raise HTTPException(status_code=400, detail='Missing required variables: var1 and var2')
 
-        file_data = load_file_data(request.file_id)
+        file_data = load_file_data(request.file_id, [request.variables['var1'], request.variables['var2']])
         results = run_kendall_correlation(file_data, request.variables['var1'], request.variables['var2'])
 
         return results
@@ -203,3 +214,44 @@ async def kendall_correlation(request: StatisticalTestRequest):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/correlation-matrix")
+async def correlation_matrix(request: CorrelationMatrixRequest):
+    """Pairwise correlations for every pair of the requested columns"""
+    try:
+        if len(request.columns) < 2:
+            raise HTTPException(status_code=400, detail='At least two columns are required')
+
+        file_data = load_file_data(request.file_id, request.columns)
+        results = run_correlations_matrix(file_data, request.columns, request.method, request.precision)
+
+        return results
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/run-all")
+async def run_all_tests(request: RunAllRequest):
+    """Run several statistical tests on one file in a single request"""
+    try:
+        spec = []
+        for entry in request.tests:
+            test_type = entry.get('test')
+            if test_type not in TESTS:
+                raise HTTPException(status_code=400, detail=f"Unknown test '{test_type}'")
+            variables = entry.get('variables') or {}
+            _, names = TESTS[test_type]
+            if not all(variables.get(name) for name in names):
+                raise HTTPException(status_code=400, detail=f"Missing required variables for {test_type}: {' and '.join(names)}")
+            spec.append((test_type, tuple(variables[name] for name in names)))
+
+        columns = list(dict.fromkeys(col for _, args in spec for col in args))
+        file_data = load_file_data(request.file_id, columns)
+        results = run_all(file_data, spec)
+
+        return {'results': results}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
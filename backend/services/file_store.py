@@ -0,0 +1,65 @@
+import gc
+import os
+import threading
+from collections import OrderedDict
+
+# Upper bounds for the in-memory upload store; least recently used files are evicted first
+MAX_FILES = int(os.getenv('UPLOAD_CACHE_MAX_FILES', 64))
+MAX_BYTES = int(os.getenv('UPLOAD_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+
+_files = OrderedDict()
+_sizes = {}
+_lock = threading.Lock()
+
+
+def _payload_size(payload):
+    """Approximate memory held by a stored payload"""
+    df = payload.get('dataframe')
+    if df is None:
+        return 0
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _evict(file_id):
+    # Only drop the store's reference: requests already holding the payload finish with it
+    _files.pop(file_id)
+    _sizes.pop(file_id, None)
+
+
+def put_file(file_id, payload):
+    """Store an uploaded file, evicting least recently used files over budget"""
+    size = _payload_size(payload)
+    evicted = False
+    with _lock:
+        if file_id in _files:
+            _evict(file_id)
+        _files[file_id] = payload
+        _sizes[file_id] = size
+
+        # Always keep the newest file, even if it alone exceeds the byte budget
+        while len(_files) > 1 and (len(_files) > MAX_FILES or sum(_sizes.values()) > MAX_BYTES):
+            _evict(next(iter(_files)))
+            evicted = True
+
+    if evicted:
+        gc.collect()
+
+
+def get_file(file_id):
+    """Return the stored payload for file_id (marking it recently used), or None"""
+    with _lock:
+        payload = _files.get(file_id)
+        if payload is not None:
+            _files.move_to_end(file_id)
+        return payload
+
+
+def get_column(file_id, column, dtype=None):
+    """Return a stored column as a NumPy array (read-only view when no dtype conversion is needed)"""
+    payload = get_file(file_id)
+    if payload is None:
+        raise KeyError(file_id)
+    arr = payload['dataframe'][column].to_numpy(dtype=dtype, copy=False)
+    # The array may share memory with the stored upload; never let a caller modify it in place
+    arr.flags.writeable = False
+    return arr
@@ -1,11 +1,16 @@
+from types import SimpleNamespace
+
 import numpy as np
 import pandas as pd
 from scipy import stats
+from scipy.linalg import cho_factor, cho_solve
+from scipy.special import expit
 import statsmodels.api as sm
-from statsmodels.stats.outliers_influence import variance_inflation_factor
 from statsmodels.stats.diagnostic import het_breuschpagan
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import accuracy_score, roc_auc_score, confusion_matrix
+from sklearn.metrics import roc_auc_score
+
+# Below this many rows a float32 regression saves nothing worth its precision loss
+FLOAT32_MIN_ROWS = 10000
 
 
 def safe_float(value, default=0.0):
@@ -21,16 +26,167 @@ def safe_float(value, default=0.0):
         return default
 
 
-def prepare_regression_data(data, dependent_var, independent_vars):
-    """Prepare data for regression analysis"""
-    df = pd.DataFrame(data)
-
-    # Get dependent variable
-    y = pd.to_numeric(df[dependent_var], errors='coerce')
-
-    # Prepare independent variables
-    X_dict = {}
-    for var in independent_vars:
+def _coerce_payload(data, needed):
+    """DataFrame of just the needed columns from a DataFrame, dict of columns or list of row dicts"""
+    needed = list(dict.fromkeys(needed))
+    if isinstance(data, pd.DataFrame):
+        # Stored upload dataframes are shared, so they are only read, never copied or modified
+        return data
+    if isinstance(data, dict):
+        return pd.DataFrame({col: data[col] for col in needed})
+    # Row-oriented records: build only the needed columns, skipping inference on the rest
+    return pd.DataFrame({col: [row.get(col) for row in data] for col in needed})
+
+
+def _sanitize(values, default=0.0):
+    """Array version of safe_float: float64 ndarray with NaN/Inf replaced by default"""
+    return np.nan_to_num(
+        np.asarray(values, dtype=np.float64), nan=default, posinf=default, neginf=default
+    )
+
+
+def _vif_from_design(X_no_const):
+    """Variance inflation factors from the inverse predictor correlation matrix"""
+    columns = list(X_no_const.columns)
+    if len(columns) == 0:
+        return {}
+    if len(columns) == 1:
+        return {columns[0]: 1.0}
+
+    # VIF_i is the i-th diagonal element of inv(R), R = correlation matrix of the predictors
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = np.corrcoef(X_no_const.to_numpy(dtype=np.float64), rowvar=False)
+        try:
+            vifs = np.diag(np.linalg.inv(corr))
+        except np.linalg.LinAlgError:
+            # Perfectly collinear predictors
+            vifs = np.full(len(columns), np.inf)
+
+    return dict(zip(columns, _sanitize(vifs, default=1.0).tolist()))
+
+
+def _check_cholesky(cho):
+    """Raise LinAlgError when a Cholesky factor shows a numerically rank-deficient matrix"""
+    chol_diag = np.abs(np.diag(cho[0]))
+    if chol_diag.min() < 1e-7 * chol_diag.max():
+        # Leave it to the pinv-based solver
+        raise np.linalg.LinAlgError("Design matrix is (nearly) singular")
+
+
+def _float32_normal_equations(X_arr, y_arr):
+    """Coefficients and X'X factor of an intercept-first design, with the O(n*p^2) product in float32"""
+    n = len(y_arr)
+    # Centre and scale in float64 before downcasting: on raw columns float32 rounding of
+    # X'X swamps the signal as soon as a predictor's mean is large relative to its spread
+    means = X_arr[:, 1:].mean(axis=0)
+    scales = X_arr[:, 1:].std(axis=0)
+    if not np.all(scales > 0):
+        raise np.linalg.LinAlgError("Constant predictor")
+    Z = ((X_arr[:, 1:] - means) / scales).astype(np.float32)
+
+    ZtZ = (Z.T @ Z).astype(np.float64)
+    z_cho = cho_factor(ZtZ)
+    _check_cholesky(z_cho)
+
+    def solve(target):
+        # Intercept-first coefficients fitting target, mapped back to the original columns
+        target_mean = target.mean()
+        gamma = cho_solve(z_cho, (Z.T @ (target - target_mean).astype(np.float32)).astype(np.float64))
+        slopes = gamma / scales
+        return np.concatenate(([target_mean - means @ slopes], slopes))
+
+    # One float64 refinement step on the residuals recovers the accuracy lost to float32
+    beta = solve(y_arr)
+    beta += solve(y_arr - X_arr @ beta)
+
+    # X'X of the original design rebuilt from the centred cross-products (for SEs and diagnostics)
+    centered = ZtZ * np.outer(scales, scales)
+    XtX = np.empty((len(beta), len(beta)))
+    XtX[0, 0] = n
+    XtX[0, 1:] = XtX[1:, 0] = n * means
+    XtX[1:, 1:] = centered + n * np.outer(means, means)
+    return beta, cho_factor(XtX)
+
+
+def _fast_ols(X, y, precision='float64'):
+    """OLS via Cholesky solve of the normal equations (raises LinAlgError if X'X is near-singular or the fit is degenerate)"""
+    X_arr = X.to_numpy(dtype=np.float64)
+    y_arr = y.to_numpy(dtype=np.float64)
+    n, p = X_arr.shape
+
+    if precision == 'float32' and p > 1 and X.columns[0] == 'const':
+        # Only the X'X product runs in float32; the solve, residuals and SEs stay float64
+        beta, cho = _float32_normal_equations(X_arr, y_arr)
+    else:
+        cho = cho_factor(X_arr.T @ X_arr)
+        _check_cholesky(cho)
+        beta = cho_solve(cho, X_arr.T @ y_arr)
+
+    resid = y_arr - X_arr @ beta
+    df_resid = n - p
+    ssr = float(resid @ resid)
+    y_centered = y_arr - y_arr.mean()
+    centered_tss = float(y_centered @ y_centered)
+    if df_resid <= 0 or centered_tss == 0 or ssr == 0:
+        # Saturated design, constant outcome or exact fit: the ratios below are undefined,
+        # so let statsmodels produce its (NaN/Inf) results
+        raise np.linalg.LinAlgError("Degenerate fit")
+    mse_resid = ssr / df_resid
+    cov_beta = mse_resid * cho_solve(cho, np.eye(p))
+    se = np.sqrt(np.diag(cov_beta))
+    tvalues = beta / se
+    pvalues = 2 * stats.t.sf(np.abs(tvalues), df_resid)
+
+    rsquared = 1 - ssr / centered_tss
+    rsquared_adj = 1 - (n - 1) / df_resid * (1 - rsquared)
+    if p > 1:
+        fvalue = (rsquared / (p - 1)) / ((1 - rsquared) / df_resid)
+        f_pvalue = stats.f.sf(fvalue, p - 1, df_resid)
+    else:
+        fvalue = f_pvalue = np.nan
+
+    t_crit = stats.t.ppf(0.975, df_resid)
+    conf_int = pd.DataFrame(
+        np.column_stack([beta - t_crit * se, beta + t_crit * se]), index=X.columns, columns=[0, 1]
+    )
+
+    # Mirrors the subset of statsmodels' OLSResults used by run_linear_regression
+    return SimpleNamespace(
+        params=pd.Series(beta, index=X.columns),
+        bse=pd.Series(se, index=X.columns),
+        tvalues=pd.Series(tvalues, index=X.columns),
+        pvalues=pd.Series(pvalues, index=X.columns),
+        conf_int=lambda: conf_int,
+        resid=pd.Series(resid, index=y.index),
+        exog=X_arr,
+        cho=cho,
+        rsquared=rsquared,
+        rsquared_adj=rsquared_adj,
+        fvalue=fvalue,
+        f_pvalue=f_pvalue,
+        nobs=float(n),
+        df_resid=float(df_resid),
+        mse_resid=mse_resid,
+    )
+
+
+def _dummy_block(series, var):
+    """Drop-first one-hot float64 block, same as pd.get_dummies(series, prefix=var, drop_first=True)"""
+    # Missing values get code -1 and therefore an all-zero row, as with get_dummies
+    codes, categories = pd.factorize(series, sort=True)
+    n_rows = len(codes)
+    dummies = np.zeros((n_rows, max(len(categories) - 1, 0)), dtype=np.float64)
+    rows = np.flatnonzero(codes >= 1)
+    dummies[rows, codes[rows] - 1] = 1.0
+    names = [f'{var}_{category}' for category in categories[1:]]
+    return dummies, names
+
+
+def _build_design(df, independent_vars):
+    """Build the predictor matrix (numeric columns as-is, categoricals one-hot encoded)"""
+    X_blocks = []
+    X_columns = []
+    for var in dict.fromkeys(independent_vars):
         series = df[var]
         # Try to convert to numeric first
         numeric_series = pd.to_numeric(series, errors='coerce')
@@ -41,23 +197,113 @@ def prepare_regression_data(data, dependent_var, independent_vars):
 
         if numeric_count == original_count and original_count > 0:
             # It's numeric - use the numeric version
-            X_dict[var] = numeric_series.astype('float64')
+            X_blocks.append(numeric_series.to_numpy(dtype=np.float64)[:, None])
+            X_columns.append(var)
         else:
             # It's categorical - one-hot encode it
-            dummies = pd.get_dummies(series, prefix=var, drop_first=True, dtype='float64')
-            for col in dummies.columns:
-                X_dict[col] = dummies[col].astype('float64')
+            dummies, dummy_names = _dummy_block(series, var)
+            X_blocks.append(dummies)
+            X_columns.extend(dummy_names)
+
+    # Every block is already float64, so one hstack gives the final design matrix
+    return np.hstack(X_blocks), X_columns
+
+
+def _drop_missing(y_arr, X_arr):
+    """Keep rows where the outcome and every predictor are present"""
+    valid = ~np.isnan(X_arr).any(axis=1)
+    if y_arr.dtype.kind == 'f':
+        valid &= ~np.isnan(y_arr)
+    return y_arr[valid], X_arr[valid]
+
+
+def _fast_logit(X, y, max_iter=35, tol=1e-8):
+    """Logit MLE by Newton-Raphson/IRLS (raises LinAlgError if it fails to converge)"""
+    X_arr = X.to_numpy(dtype=np.float64)
+    y_arr = y.to_numpy(dtype=np.float64)
+    n, p = X_arr.shape
+
+    beta = np.zeros(p)
+    for _ in range(max_iter):
+        mu = expit(X_arr @ beta)
+        weights = mu * (1 - mu)
+        grad = X_arr.T @ (y_arr - mu)
+        hessian = X_arr.T @ (weights[:, None] * X_arr)
+        step = np.linalg.solve(hessian, grad)
+        beta = beta + step
+        if not np.all(np.isfinite(beta)):
+            raise np.linalg.LinAlgError("Logit fit diverged")
+        if np.max(np.abs(step)) < tol:
+            break
+    else:
+        # Typically (quasi-)perfect separation
+        raise np.linalg.LinAlgError("Logit fit did not converge")
+
+    # Covariance from the information matrix at the optimum, one factorization
+    eta = X_arr @ beta
+    mu = expit(eta)
+    cho = cho_factor(X_arr.T @ ((mu * (1 - mu))[:, None] * X_arr))
+    cov_beta = cho_solve(cho, np.eye(p))
+    se = np.sqrt(np.diag(cov_beta))
+    zvalues = beta / se
+    pvalues = 2 * stats.norm.sf(np.abs(zvalues))
+    z_crit = stats.norm.ppf(0.975)
+    conf_int = pd.DataFrame(
+        np.column_stack([beta - z_crit * se, beta + z_crit * se]), index=X.columns, columns=[0, 1]
+    )
+    llf = float(np.sum(y_arr * eta - np.logaddexp(0, eta)))
+
+    # Mirrors the subset of statsmodels' LogitResults used by run_logistic_regression
+    return SimpleNamespace(
+        params=pd.Series(beta, index=X.columns),
+        bse=pd.Series(se, index=X.columns),
+        tvalues=pd.Series(zvalues, index=X.columns),
+        pvalues=pd.Series(pvalues, index=X.columns),
+        conf_int=lambda: conf_int,
+        predict=lambda exog: expit(np.asarray(exog, dtype=np.float64) @ beta),
+        llf=llf,
+        aic=-2 * llf + 2 * p,
+        bic=-2 * llf + np.log(n) * p,
+    )
+
+
+def _resid_summary(resid, block=1 << 17):
+    """Min, max and mean of the residuals in one cache-blocked pass instead of three full sweeps"""
+    if resid.size <= block:
+        return resid.min(), resid.max(), resid.mean()
+    low, high, total = np.inf, -np.inf, 0.0
+    for start in range(0, resid.size, block):
+        chunk = resid[start:start + block]
+        low = min(low, chunk.min())
+        high = max(high, chunk.max())
+        total += chunk.sum()
+    return low, high, total / resid.size
+
+
+def _breusch_pagan_from_cache(resid, X_arr, cho):
+    """Breusch-Pagan LM test (studentized, as het_breuschpagan) reusing the OLS Cholesky factor"""
+    n, p = X_arr.shape
+    resid_sq = resid ** 2
+    gamma = cho_solve(cho, X_arr.T @ resid_sq)
+    aux_resid = resid_sq - X_arr @ gamma
+    aux_tss = float(((resid_sq - resid_sq.mean()) ** 2).sum())
+    rsquared = 1 - float(aux_resid @ aux_resid) / aux_tss if aux_tss > 0 else 0.0
+    lm = n * rsquared
+    return lm, stats.chi2.sf(lm, p - 1)
+
 
-    X = pd.DataFrame(X_dict)
+def prepare_regression_data(data, dependent_var, independent_vars):
+    """Prepare data for regression analysis"""
+    df = _coerce_payload(data, [dependent_var, *independent_vars])
 
-    # Ensure all columns are numeric
-    for col in X.columns:
-        X[col] = pd.to_numeric(X[col], errors='coerce')
+    # Get dependent variable
+    y_arr = pd.to_numeric(df[dependent_var], errors='coerce').to_numpy(dtype=np.float64)
 
-    # Remove rows with missing values
-    valid_idx = y.notna() & X.notna().all(axis=1)
-    y = y[valid_idx].reset_index(drop=True).astype('float64')
-    X = X[valid_idx].reset_index(drop=True)
+    # Prepare independent variables and remove rows with missing values
+    X_arr, X_columns = _build_design(df, independent_vars)
+    y_arr, X_arr = _drop_missing(y_arr, X_arr)
+    y = pd.Series(y_arr)
+    X = pd.DataFrame(X_arr, columns=X_columns)
 
     if len(y) == 0:
         raise ValueError("No valid data after removing missing values")
@@ -68,7 +314,7 @@ def prepare_regression_data(data, dependent_var, independent_vars):
     return y, X
 
 
-def run_linear_regression(data, dependent_var, independent_vars):
+def run_linear_regression(data, dependent_var, independent_vars, precision='float64'):
     """Fit linear regression model"""
     try:
         y, X = prepare_regression_data(data, dependent_var, independent_vars)
@@ -76,54 +322,60 @@ def run_linear_regression(data, dependent_var, independent_vars):
         # Add constant
         X = sm.add_constant(X)
 
-        # Fit model
-        model = sm.OLS(y, X).fit()
-
-        # Extract coefficients
-        coefficients = []
-        conf_int_df = model.conf_int()
-        for i, var_name in enumerate(X.columns):
-            coef = model.params.iloc[i]
-            std_err = model.bse.iloc[i]
-            t_stat = model.tvalues.iloc[i]
-            p_val = model.pvalues.iloc[i]
-            ci_row = conf_int_df.iloc[i]
-
-            coefficients.append({
-                'variable': var_name,
-                'coefficient': safe_float(coef, 0),
-                'std_error': safe_float(std_err, 0),
-                't_statistic': safe_float(t_stat, 0),
-                'p_value': safe_float(p_val, 0),
-                'ci_lower': safe_float(ci_row.iloc[0], 0),
-                'ci_upper': safe_float(ci_row.iloc[1], 0)
-            })
+        # Fit model (Cholesky fast path, statsmodels for rank-deficient designs)
+        try:
+            # float32 halves the memory traffic of X'X on large designs; small samples keep float64
+            model = _fast_ols(X, y, precision=precision if len(y) >= FLOAT32_MIN_ROWS else 'float64')
+        except np.linalg.LinAlgError:
+            model = sm.OLS(y, X).fit()
+
+        # Extract coefficients (whole arrays at once, NaN/Inf mapped to 0)
+        ci = _sanitize(model.conf_int())
+        coefficients = pd.DataFrame({
+            'variable': X.columns,
+            'coefficient': _sanitize(model.params),
+            'std_error': _sanitize(model.bse),
+            't_statistic': _sanitize(model.tvalues),
+            'p_value': _sanitize(model.pvalues),
+            'ci_lower': ci[:, 0],
+            'ci_upper': ci[:, 1]
+        }).to_dict('records')
 
         # Calculate VIF for multicollinearity
-        vif_dict = {}
-        X_no_const = X.drop('const', axis=1)
-        if len(X_no_const.columns) > 0:
-            for i, col in enumerate(X_no_const.columns):
-                try:
-                    vif = variance_inflation_factor(X_no_const.values, i)
-                    vif_dict[col] = safe_float(vif, 1.0)
-                except:
-                    vif_dict[col] = 1.0
-
-        # Breusch-Pagan test for homoscedasticity
-        bp_stat, bp_pval, _, _ = het_breuschpagan(model.resid, X)
+        vif_dict = _vif_from_design(X.drop('const', axis=1))
+
+        # Residuals pulled out of the Series once for every diagnostic below
+        resid = np.asarray(model.resid, dtype=np.float64)
+
+        # Breusch-Pagan test for homoscedasticity (reuses the X'X factorization when available)
+        if hasattr(model, 'cho'):
+            bp_stat, bp_pval = _breusch_pagan_from_cache(resid, model.exog, model.cho)
+        else:
+            bp_stat, bp_pval, _, _ = het_breuschpagan(resid, X)
         homoscedasticity_passed = bool(bp_pval > 0.05)
 
-        # Shapiro-Wilk test for normality of residuals
-        if len(model.resid) > 2:
-            _, shapiro_pval = stats.shapiro(model.resid)
+        # Normality of residuals: Shapiro-Wilk p-values are unreliable above 5000
+        # observations, so large samples use D'Agostino-Pearson instead
+        n_resid = len(resid)
+        if n_resid > 5000:
+            _, normality_pval = stats.normaltest(resid)
+            normality_method = "D'Agostino-Pearson (residuals)"
+        elif n_resid > 2:
+            _, normality_pval = stats.shapiro(resid)
+            normality_method = 'Shapiro-Wilk (residuals)'
         else:
-            shapiro_pval = 0.5
-        normality_passed = bool(shapiro_pval > 0.05)
+            normality_pval = 0.5
+            normality_method = 'Shapiro-Wilk (residuals)'
+        normality_passed = bool(normality_pval > 0.05)
+
+        resid_min, resid_max, resid_mean = _resid_summary(resid)
 
         # Multicollinearity check (VIF > 5 indicates problem)
         multicollinearity_passed = bool(all(v < 5 for v in vif_dict.values())) if vif_dict else True
 
+        # Predictor significance (intercept excluded)
+        all_predictors_significant = bool((model.pvalues.to_numpy()[1:] < 0.05).all())
+
         return {
             'regression_type': 'linear',
             'dependent_variable': dependent_var,
@@ -140,9 +392,9 @@ def run_linear_regression(data, dependent_var, independent_vars):
             'residuals': {
                 'residual_std_error': safe_float(np.sqrt(model.mse_resid), 0),
                 'degrees_of_freedom': int(model.df_resid),
-                'min': safe_float(model.resid.min(), 0),
-                'max': safe_float(model.resid.max(), 0),
-                'mean': safe_float(model.resid.mean(), 0)
+                'min': safe_float(resid_min, 0),
+                'max': safe_float(resid_max, 0),
+                'mean': safe_float(resid_mean, 0)
             },
             'assumptions': {
                 'multicollinearity': {
@@ -151,8 +403,8 @@ def run_linear_regression(data, dependent_var, independent_vars):
                     'details': vif_dict
                 },
                 'normality': {
-                    'method': 'Shapiro-Wilk (residuals)',
-                    'p_value': safe_float(shapiro_pval, 0),
+                    'method': normality_method,
+                    'p_value': safe_float(normality_pval, 0),
                     'passed': normality_passed
                 },
                 'homoscedasticity': {
@@ -162,7 +414,7 @@ def run_linear_regression(data, dependent_var, independent_vars):
                 }
             },
             'interpretation': f'Model explains {safe_float(model.rsquared * 100, 0):.1f}% of variance. ' + \
-                            f'{"All predictors significant at p<0.05." if all(p < 0.05 for p in model.pvalues[1:]) else "Some predictors not significant."}'
+                            f'{"All predictors significant at p<0.05." if all_predictors_significant else "Some predictors not significant."}'
         }
 
     except Exception as e:
@@ -172,118 +424,102 @@ def run_linear_regression(data, dependent_var, independent_vars):
 def run_logistic_regression(data, dependent_var, independent_vars):
     """Fit logistic regression model"""
     try:
-        df = pd.DataFrame(data)
+        df = _coerce_payload(data, [dependent_var, *independent_vars])
 
         # Get dependent variable and ensure it's binary
-        y_raw = df[dependent_var].dropna()
-        unique_vals = y_raw.unique()
-
-        if len(unique_vals) != 2:
-            raise ValueError(f"Logistic regression requires binary outcome, found {len(unique_vals)} classes")
-
-        # Encode binary outcome to 0/1
-        le = LabelEncoder()
-        y = pd.Series(le.fit_transform(y_raw), index=y_raw.index)
-
-        # Prepare independent variables
-        X_dict = {}
-        for var in independent_vars:
-            series = df[var]
-            # Try to convert to numeric first
-            numeric_series = pd.to_numeric(series, errors='coerce')
-
-            # Count how many values successfully converted to numeric
-            numeric_count = numeric_series.notna().sum()
-            original_count = series.notna().sum()
-
-            if numeric_count == original_count and original_count > 0:
-                # It's numeric - use the numeric version
-                X_dict[var] = numeric_series.astype('float64')
-            else:
-                # It's categorical - one-hot encode it
-                dummies = pd.get_dummies(series, prefix=var, drop_first=True, dtype='float64')
-                for col in dummies.columns:
-                    X_dict[col] = dummies[col].astype('float64')
-
-        X = pd.DataFrame(X_dict)
-
-        # Ensure all columns are numeric
-        for col in X.columns:
-            X[col] = pd.to_numeric(X[col], errors='coerce')
-
-        # Remove rows with missing values
-        valid_idx = y.notna() & X.notna().all(axis=1)
-        y = y[valid_idx].reset_index(drop=True).astype('int64')
-        X = X[valid_idx].reset_index(drop=True)
-
-        if len(y) == 0:
+        y_col = df[dependent_var]
+        predictors = list(dict.fromkeys(independent_vars))
+
+        if y_col.dtype.kind in 'biu' and isinstance(y_col.dtype, np.dtype) and len(y_col) > 0 \
+                and y_col.min() == 0 and y_col.max() == 1:
+            # Already a 0/1 (or bool) outcome with no missing values: no hashing or encoding needed
+            y_arr = y_col.to_numpy().astype(np.int8)
+            predictor_df = df[predictors]
+        else:
+            y_present = y_col.notna().to_numpy()
+            y_vals = y_col.to_numpy()[y_present]
+            unique_vals = pd.unique(y_vals)
+
+            if len(unique_vals) != 2:
+                raise ValueError(f"Logistic regression requires binary outcome, found {len(unique_vals)} classes")
+
+            # Encode binary outcome to 0/1 (sorted classes, the order LabelEncoder used)
+            positive_class = np.sort(unique_vals)[1]
+            y_arr = (y_vals == positive_class).astype(np.int8)
+            predictor_df = df.loc[y_present, predictors]
+
+        # Prepare independent variables for the rows with an outcome, then drop missing predictors
+        X_arr, X_columns = _build_design(predictor_df, independent_vars)
+        y_arr, X_arr = _drop_missing(y_arr, X_arr)
+        y = pd.Series(y_arr)
+        X = pd.DataFrame(X_arr, columns=X_columns)
+
+        n_obs = len(y)
+        if n_obs == 0:
             raise ValueError("No valid data after removing missing values")
 
         # Add constant
         X = sm.add_constant(X)
 
-        # Fit logistic regression
-        logit_model = sm.Logit(y, X).fit(disp=0)
-
-        # Extract coefficients with odds ratios
-        coefficients = []
-        conf_int_df = logit_model.conf_int()
-        for i, var_name in enumerate(X.columns):
-            coef = logit_model.params.iloc[i]
-            std_err = logit_model.bse.iloc[i]
-            z_stat = logit_model.tvalues.iloc[i]
-            p_val = logit_model.pvalues.iloc[i]
-            ci_row = conf_int_df.iloc[i]
-            odds_ratio = np.exp(coef)
-
-            coefficients.append({
-                'variable': var_name,
-                'coefficient': safe_float(coef, 0),
-                'std_error': safe_float(std_err, 0),
-                'z_statistic': safe_float(z_stat, 0),
-                'p_value': safe_float(p_val, 0),
-                'ci_lower': safe_float(ci_row.iloc[0], 0),
-                'ci_upper': safe_float(ci_row.iloc[1], 0),
-                'odds_ratio': safe_float(odds_ratio, 1.0)
-            })
+        # Fit logistic regression (NumPy Newton/IRLS, statsmodels if it does not converge)
+        try:
+            logit_model = _fast_logit(X, y)
+        except np.linalg.LinAlgError:
+            logit_model = sm.Logit(y, X).fit(disp=0)
+
+        # Extract coefficients with odds ratios (whole arrays at once)
+        params = logit_model.params.to_numpy()
+        ci = _sanitize(logit_model.conf_int())
+        with np.errstate(over='ignore'):
+            odds_ratios = _sanitize(np.exp(params), default=1.0)
+        coefficients = pd.DataFrame({
+            'variable': X.columns,
+            'coefficient': _sanitize(params),
+            'std_error': _sanitize(logit_model.bse),
+            'z_statistic': _sanitize(logit_model.tvalues),
+            'p_value': _sanitize(logit_model.pvalues),
+            'ci_lower': ci[:, 0],
+            'ci_upper': ci[:, 1],
+            'odds_ratio': odds_ratios
+        }).to_dict('records')
 
         # Calculate VIF for multicollinearity
-        vif_dict = {}
-        X_no_const = X.drop('const', axis=1)
-        if len(X_no_const.columns) > 0:
-            for i, col in enumerate(X_no_const.columns):
-                try:
-                    vif = variance_inflation_factor(X_no_const.values, i)
-                    vif_dict[col] = safe_float(vif, 1.0)
-                except:
-                    vif_dict[col] = 1.0
+        vif_dict = _vif_from_design(X.drop('const', axis=1))
 
         # Multicollinearity check
         multicollinearity_passed = bool(all(v < 5 for v in vif_dict.values())) if vif_dict else True
 
         # Calculate classification metrics
         y_pred_prob = logit_model.predict(X)
-        y_pred = (y_pred_prob > 0.5).astype(int)
 
-        accuracy = accuracy_score(y, y_pred)
+        # Confusion counts from one bincount over (actual << 1) | predicted
+        confusion_idx = (y_arr.astype(np.uint8) << 1) | (y_pred_prob > 0.5).astype(np.uint8)
+        tn, fp, fn, tp = np.bincount(confusion_idx, minlength=4).tolist()
+
+        accuracy = (tn + tp) / n_obs
         try:
             auc = roc_auc_score(y, y_pred_prob)
         except:
             auc = 0.5
 
-        tn, fp, fn, tp = confusion_matrix(y, y_pred).ravel()
         sensitivity = tp / (tp + fn) if (tp + fn) > 0 else 0
         specificity = tn / (tn + fp) if (tn + fp) > 0 else 0
 
-        # McFadden's pseudo R-squared
+        # Null (intercept-only) log-likelihood in closed form: n * (p log p + (1 - p) log(1 - p))
         llf_full = logit_model.llf
-        llf_null = -len(y) * np.log(1 / (1 - y.mean()))  # null model with intercept only
-        mcfadden_r2 = 1 - (llf_full / llf_null) if llf_null != 0 else 0
-
-        # Chi-square for overall model significance
         n_params = len(X.columns) - 1  # exclude intercept
-        chi_square_stat = -2 * (llf_null - llf_full)
-        chi_square_pval = 1 - stats.chi2.cdf(chi_square_stat, n_params)
+        p_mean = y_arr.mean()
+        if 0 < p_mean < 1:
+            llf_null = n_obs * (p_mean * np.log(p_mean) + (1 - p_mean) * np.log(1 - p_mean))
+            # McFadden's pseudo R-squared and chi-square for overall model significance
+            mcfadden_r2 = 1 - (llf_full / llf_null)
+            chi_square_stat = -2 * (llf_null - llf_full)
+            chi_square_pval = stats.chi2.sf(chi_square_stat, n_params)
+        else:
+            # Only one outcome class left after dropping missing rows
+            mcfadden_r2 = 0
+            chi_square_stat = 0
+            chi_square_pval = 1.0
 
         return {
             'regression_type': 'logistic',
@@ -295,7 +531,7 @@ def run_logistic_regression(data, dependent_var, independent_vars):
                 'bic': safe_float(logit_model.bic, 0),
                 'chi_square': safe_float(chi_square_stat, 0),
                 'chi_square_pvalue': safe_float(chi_square_pval, 0),
-                'n_samples': len(y)
+                'n_samples': n_obs
             },
             'coefficients': coefficients,
             'classification_metrics': {
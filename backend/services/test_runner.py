@@ -1,6 +1,17 @@
+import math
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
 from scipy import stats
+from scipy.special import ndtri
+
+# Two-sided 95% standard normal quantile, ndtri(0.975)
+Z_95 = 1.959963984540054
 
 
 def safe_float(value, default=0.0):
@@ -16,80 +27,201 @@ def safe_float(value, default=0.0):
         return default
 
 
-def prepare_numeric_data(data, column):
-    """Extract and clean numeric data"""
-    values = pd.to_numeric(data[column], errors='coerce').dropna()
-    return values.values
+def _safe_array(values, default=0.0):
+    """Array version of safe_float: NaN/Inf replaced by default in one vectorized pass"""
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(np.isfinite(values), values, default)
+
+
+def _shapiro_pvalues(*samples):
+    """Shapiro-Wilk p-value per sample (0.5 for samples too small to test)"""
+    return [stats.shapiro(s)[1] if len(s) > 2 else 0.5 for s in samples]
 
 
-def prepare_categorical_data(data, column):
-    """Extract categorical data"""
-    return data[column].dropna().values
+# Shapiro-Wilk p-values are unreliable past 5000 values; larger samples use Anderson-Darling
+ANDERSON_MIN_N = 5000
+
 
+def _ad_to_p(statistic, n):
+    """Approximate p-value of an Anderson-Darling normality statistic (Stephens, mean and variance estimated)"""
+    a2 = statistic * (1 + 0.75 / n + 2.25 / n ** 2)
+    if a2 > 13:
+        # Outside the range Stephens fitted the formula to, so cap the p-value (p < 5e-31 at 13)
+        return 0.0
+    if a2 >= 0.6:
+        return math.exp(1.2937 - 5.709 * a2 + 0.0186 * a2 ** 2)
+    if a2 >= 0.34:
+        return math.exp(0.9177 - 4.279 * a2 - 1.38 * a2 ** 2)
+    if a2 >= 0.2:
+        return 1 - math.exp(-8.318 + 42.796 * a2 - 59.938 * a2 ** 2)
+    return 1 - math.exp(-13.436 + 101.14 * a2 - 223.73 * a2 ** 2)
 
-def run_ttest(data, numeric_var, categorical_var):
-    """Independent samples t-test"""
+
+def _normality(*samples):
+    """(method, p-value) per sample: Anderson-Darling for large samples, Shapiro-Wilk otherwise"""
+    small = iter(_shapiro_pvalues(*[s for s in samples if len(s) <= ANDERSON_MIN_N]))
+    return [
+        ('Anderson-Darling', _ad_to_p(stats.anderson(s, 'norm').statistic, len(s)))
+        if len(s) > ANDERSON_MIN_N else ('Shapiro-Wilk', next(small))
+        for s in samples
+    ]
+
+
+# Small LRU caches keyed by DataFrame identity: routes pass the stored upload itself, so each
+# column is factorized or ranked once and reused by later tests on the same file. Entries are
+# (weak reference to the DataFrame, value); a hit must come from that very same, still live,
+# object, and evicted uploads are not kept alive.
+_cache_lock = threading.Lock()
+_factor_cache = OrderedDict()
+_rank_cache = OrderedDict()
+
+
+def _memoize(cache, size, key, owner, build):
+    """Cached value for key, validated against owner; build and store it on a miss"""
+    with _cache_lock:
+        entry = cache.get(key)
+        if entry is not None and entry[0]() is owner:
+            cache.move_to_end(key)
+            return entry[1]
+
+    value = build()
+    with _cache_lock:
+        cache[key] = (weakref.ref(owner), value)
+        cache.move_to_end(key)
+        while len(cache) > size:
+            cache.popitem(last=False)
+    return value
+
+
+def _coerce(data):
+    """Use a DataFrame as-is, otherwise wrap a dict of column arrays without copying"""
+    if isinstance(data, pd.DataFrame):
+        return data
+    return pd.DataFrame(data, copy=False)
+
+
+def _factor(df, column):
+    """Codes (-1 for missing) and labels of a categorical column, in order of appearance, cached per DataFrame object"""
+    return _memoize(_factor_cache, 16, (id(df), column), df, lambda: pd.factorize(df[column].to_numpy()))
+
+
+def _numeric_with_groups(df, numeric_var, categorical_var):
+    """Numeric values, group codes and group labels for the rows where both are present"""
+    values = pd.to_numeric(df[numeric_var], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    all_codes, labels = _factor(df, categorical_var)
+    mask = (all_codes >= 0) & ~np.isnan(values)
+    codes = all_codes[mask]
+
+    # Renumber the groups that still have values in order of first appearance (integer hashing only)
+    present = pd.unique(codes)
+    remap = np.empty(len(labels), dtype=np.intp)
+    remap[present] = np.arange(len(present))
+    return values[mask], remap[codes], labels[present]
+
+
+def _column_ranks(df, column, values):
+    """Average ranks of a column with no missing values (values), cached per (DataFrame object, column)"""
+    return _memoize(_rank_cache, 16, (id(df), column), df, lambda: stats.rankdata(values))
+
+
+def _spearman_from_ranks(ranks1, ranks2):
+    """Spearman rho and two-sided p-value from precomputed ranks (same formulas as stats.spearmanr)"""
+    n = len(ranks1)
+    rho = np.corrcoef(ranks1, ranks2)[0, 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_stat = rho * np.sqrt((n - 2) / ((rho + 1.0) * (1.0 - rho)))
+    return rho, 2 * stats.t.sf(np.abs(t_stat), n - 2)
+
+
+def _numeric_pair(df, var1, var2):
+    """Both columns as numbers, keeping only the rows where both are present (one joint mask)"""
+    arr = np.column_stack([
+        pd.to_numeric(df[var1], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan),
+        pd.to_numeric(df[var2], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    ])
+    arr = arr[~np.isnan(arr).any(axis=1)]
+    return arr[:, 0], arr[:, 1]
+
+
+def _moments(values):
+    """Count, mean, variance and standard deviation (ddof=1) of a 1-D sample"""
+    n = len(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = values.mean() if n else np.nan
+        deviations = values - mean
+        var = np.dot(deviations, deviations) / (n - 1) if n else np.nan
+    return n, mean, var, np.sqrt(var)
+
+
+def _mean_summary(values):
+    """n, mean, std and 95% CI of the mean for a sample, NaN/Inf reported as 0"""
+    n, mean, _, std = _moments(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ci = Z_95 * std / np.sqrt(n)
+    return {
+        'n': int(n),
+        'mean': safe_float(mean),
+        'std': safe_float(std),
+        'ci_mean_lower': safe_float(mean - ci),
+        'ci_mean_upper': safe_float(mean + ci)
+    }
+
+
+def _split_groups(values, codes, n_groups):
+    """Values sorted by group code and the group boundaries"""
+    # One stable sort on the codes replaces a full boolean scan per group
+    order = np.argsort(codes, kind='stable')
+    sorted_values = values[order]
+    bounds = np.searchsorted(codes[order], np.arange(1, n_groups))
+    return sorted_values, bounds
+
+
+def run_ttest(data, numeric_var, categorical_var, assumptions=True):
+    """Independent samples t-test (assumptions=False skips the Shapiro/Levene checks, e.g. for resampling)"""
     try:
-        df = pd.DataFrame(data)
-        numeric_data = prepare_numeric_data(df, numeric_var)
-        categorical_data = prepare_categorical_data(df, categorical_var)
+        df = _coerce(data)
+        values, codes, groups = _numeric_with_groups(df, numeric_var, categorical_var)
 
         # Get unique groups (should be 2)
-        groups = df[categorical_var].dropna().unique()
         if len(groups) != 2:
             raise ValueError(f"t-test requires exactly 2 groups, found {len(groups)}")
 
         # Split data by group
-        group1_data = df[df[categorical_var] == groups[0]][numeric_var].dropna()
-        group2_data = df[df[categorical_var] == groups[1]][numeric_var].dropna()
-
-        group1_vals = pd.to_numeric(group1_data, errors='coerce').dropna().values
-        group2_vals = pd.to_numeric(group2_data, errors='coerce').dropna().values
+        group1_vals = values[codes == 0]
+        group2_vals = values[codes == 1]
 
         # Perform t-test
         t_stat, p_value = stats.ttest_ind(group1_vals, group2_vals)
 
-        # Calculate statistics for each group
-        def calc_stats(values):
-            n = len(values)
-            mean = np.mean(values)
-            std = np.std(values, ddof=1)
-            se = std / np.sqrt(n)
-            ci = 1.96 * se
-            return {
-                'n': int(n),
-                'mean': float(mean),
-                'std': float(std),
-                'ci_mean_lower': float(mean - ci),
-                'ci_mean_upper': float(mean + ci)
-            }
-
-        group1_stats = calc_stats(group1_vals)
-        group2_stats = calc_stats(group2_vals)
-
         # Mean difference and CI
-        mean_diff = np.mean(group1_vals) - np.mean(group2_vals)
-        pooled_std = np.sqrt((group1_stats['std']**2 + group2_stats['std']**2) / 2)
-        se_diff = pooled_std * np.sqrt(1/group1_stats['n'] + 1/group2_stats['n'])
-        ci_diff = 1.96 * se_diff
+        n1, mean1, var1, _ = _moments(group1_vals)
+        n2, mean2, var2, _ = _moments(group2_vals)
+        mean_diff = mean1 - mean2
+        # Pooled SE straight from the variances: one scalar sqrt, no squaring of square roots
+        se_diff = math.sqrt(0.5 * (var1 + var2) * (1.0 / n1 + 1.0 / n2))
+        ci_diff = Z_95 * se_diff
 
         # Assumptions tests
-        _, p_norm1 = stats.shapiro(group1_vals) if len(group1_vals) > 2 else (None, 0.5)
-        _, p_norm2 = stats.shapiro(group2_vals) if len(group2_vals) > 2 else (None, 0.5)
-        _, p_levene = stats.levene(group1_vals, group2_vals)
+        assumption_checks = None
+        if assumptions:
+            # Report the group that departs most from normality, with the test used on it
+            norm_method, p_norm = min(_normality(group1_vals, group2_vals), key=lambda check: check[1])
+            _, p_levene = stats.levene(group1_vals, group2_vals)
+            assumption_checks = {
+                'normality': {
+                    'method': norm_method,
+                    'p_value': safe_float(p_norm),
+                    'passed': safe_float(p_norm) > 0.05
+                },
+                'homogeneity': {
+                    'method': 'Levene',
+                    'p_value': safe_float(p_levene),
+                    'passed': safe_float(p_levene) > 0.05
+                }
+            }
 
         df_total = len(group1_vals) + len(group2_vals) - 2
 
-        # Apply safe_float to group stats
-        def safe_group_stats(stats_dict):
-            return {
-                'n': stats_dict['n'],
-                'mean': safe_float(stats_dict['mean']),
-                'std': safe_float(stats_dict['std']),
-                'ci_mean_lower': safe_float(stats_dict['ci_mean_lower']),
-                'ci_mean_upper': safe_float(stats_dict['ci_mean_upper'])
-            }
-
         return {
             'test_name': 't-Test (Independent)',
             'test_type': 'ttest',
@@ -102,41 +234,68 @@ def run_ttest(data, numeric_var, categorical_var):
                 'ci_upper': safe_float(mean_diff + ci_diff)
             },
             'groups': {
-                str(groups[0]): safe_group_stats(group1_stats),
-                str(groups[1]): safe_group_stats(group2_stats)
-            },
-            'assumptions': {
-                'normality': {
-                    'method': 'Shapiro-Wilk',
-                    'p_value': safe_float(min(p_norm1, p_norm2)),
-                    'passed': safe_float(min(p_norm1, p_norm2)) > 0.05
-                },
-                'homogeneity': {
-                    'method': 'Levene',
-                    'p_value': safe_float(p_levene),
-                    'passed': safe_float(p_levene) > 0.05
-                }
+                str(groups[0]): _mean_summary(group1_vals),
+                str(groups[1]): _mean_summary(group2_vals)
             },
+            'assumptions': assumption_checks,
             'interpretation': 'Significant difference detected (p < 0.05)' if safe_float(p_value) < 0.05 else 'No significant difference (p ≥ 0.05)'
         }
     except Exception as e:
         raise Exception(f"Error in t-test: {str(e)}")
 
 
-def run_paired_ttest(data, var1, var2):
-    """Paired samples t-test"""
+def _welch_t(sum1, sumsq1, n1, sum2, sumsq2, n2):
+    """Welch t statistic from group sums and sums of squares (works elementwise on arrays)"""
+    mean1, mean2 = sum1 / n1, sum2 / n2
+    var1 = (sumsq1 - sum1 * mean1) / (n1 - 1)
+    var2 = (sumsq2 - sum2 * mean2) / (n2 - 1)
+    return (mean1 - mean2) / np.sqrt(var1 / n1 + var2 / n2)
+
+
+def permutation_ttest(v1, v2, n_resamples=10000, rng=None):
+    """Permutation test on the Welch t statistic; returns (t_observed, null_distribution, p_value)"""
+    v1 = np.asarray(v1, dtype=np.float64)
+    v2 = np.asarray(v2, dtype=np.float64)
+    n1, n2 = len(v1), len(v2)
+    if n1 < 2 or n2 < 2:
+        raise ValueError("Permutation t-test requires at least 2 values per group")
+    rng = np.random.default_rng(rng)
+
+    # Centring is permutation-invariant and keeps the sum-of-squares algebra well conditioned
+    pooled = np.concatenate([v1, v2])
+    pooled -= pooled.mean()
+    pooled_sq = pooled * pooled
+    total, total_sq = pooled.sum(), pooled_sq.sum()
+
+    t_observed = _welch_t(pooled[:n1].sum(), pooled_sq[:n1].sum(), n1,
+                          pooled[n1:].sum(), pooled_sq[n1:].sum(), n2)
+
+    # Each resample is a row of shuffled indices; only the first n1 (group 1) are summed, group 2
+    # follows from the totals. Rows are processed in blocks to bound the index matrix size.
+    n_total = n1 + n2
+    block = max(1, (1 << 22) // n_total)
+    null = np.empty(n_resamples)
+    for start in range(0, n_resamples, block):
+        stop = min(start + block, n_resamples)
+        idx = rng.permuted(np.broadcast_to(np.arange(n_total), (stop - start, n_total)), axis=1)[:, :n1]
+        sum1 = pooled[idx].sum(axis=1)
+        sumsq1 = pooled_sq[idx].sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            null[start:stop] = _welch_t(sum1, sumsq1, n1, total - sum1, total_sq - sumsq1, n2)
+
+    # Two-sided p-value with the +1 correction and relative tolerance used by scipy.stats.permutation_test
+    extreme = np.abs(null) >= np.abs(t_observed) * (1 - 1e-14)
+    p_value = (extreme.sum() + 1) / (n_resamples + 1)
+    return float(t_observed), null, float(p_value)
+
+
+def run_paired_ttest(data, var1, var2, assumptions=True):
+    """Paired samples t-test (assumptions=False skips the Shapiro check, e.g. for resampling)"""
     try:
-        df = pd.DataFrame(data)
+        df = _coerce(data)
 
-        # Get paired data (remove rows with missing values)
-        data_paired = df[[var1, var2]].dropna()
-        var1_vals = pd.to_numeric(data_paired[var1], errors='coerce').values
-        var2_vals = pd.to_numeric(data_paired[var2], errors='coerce').values
-
-        # Remove any remaining NaN pairs
-        valid_idx = ~(np.isnan(var1_vals) | np.isnan(var2_vals))
-        var1_vals = var1_vals[valid_idx]
-        var2_vals = var2_vals[valid_idx]
+        # Get paired data (rows where both values are present)
+        var1_vals, var2_vals = _numeric_pair(df, var1, var2)
 
         # Calculate differences
         differences = var1_vals - var2_vals
@@ -145,39 +304,20 @@ def run_paired_ttest(data, var1, var2):
         t_stat, p_value = stats.ttest_rel(var1_vals, var2_vals)
 
         # Calculate statistics
-        def calc_stats(values, name):
-            n = len(values)
-            mean = np.mean(values)
-            std = np.std(values, ddof=1)
-            se = std / np.sqrt(n)
-            ci = 1.96 * se
-            return {
-                'n': int(n),
-                'mean': float(mean),
-                'std': float(std),
-                'ci_mean_lower': float(mean - ci),
-                'ci_mean_upper': float(mean + ci)
-            }
-
-        var1_stats = calc_stats(var1_vals, var1)
-        var2_stats = calc_stats(var2_vals, var2)
-
-        mean_diff = np.mean(differences)
-        std_diff = np.std(differences, ddof=1)
-        se_diff = std_diff / np.sqrt(len(differences))
-        ci_diff = 1.96 * se_diff
+        n_diff, mean_diff, _, std_diff = _moments(differences)
+        se_diff = std_diff / np.sqrt(n_diff)
+        ci_diff = Z_95 * se_diff
 
         # Assumptions test
-        _, p_norm = stats.shapiro(differences) if len(differences) > 2 else (None, 0.5)
-
-        # Apply safe_float to pair stats
-        def safe_pair_stats(stats_dict):
-            return {
-                'n': stats_dict['n'],
-                'mean': safe_float(stats_dict['mean']),
-                'std': safe_float(stats_dict['std']),
-                'ci_mean_lower': safe_float(stats_dict['ci_mean_lower']),
-                'ci_mean_upper': safe_float(stats_dict['ci_mean_upper'])
+        assumption_checks = None
+        if assumptions:
+            [(norm_method, p_norm)] = _normality(differences)
+            assumption_checks = {
+                'normality_of_differences': {
+                    'method': norm_method,
+                    'p_value': safe_float(p_norm),
+                    'passed': safe_float(p_norm) > 0.05
+                }
             }
 
         return {
@@ -192,76 +332,84 @@ def run_paired_ttest(data, var1, var2):
                 'ci_upper': safe_float(mean_diff + ci_diff)
             },
             'pairs': {
-                var1: safe_pair_stats(var1_stats),
-                var2: safe_pair_stats(var2_stats)
-            },
-            'assumptions': {
-                'normality_of_differences': {
-                    'method': 'Shapiro-Wilk',
-                    'p_value': safe_float(p_norm),
-                    'passed': safe_float(p_norm) > 0.05
-                }
+                var1: _mean_summary(var1_vals),
+                var2: _mean_summary(var2_vals)
             },
+            'assumptions': assumption_checks,
             'interpretation': 'Significant difference detected (p < 0.05)' if safe_float(p_value) < 0.05 else 'No significant difference (p ≥ 0.05)'
         }
     except Exception as e:
         raise Exception(f"Error in paired t-test: {str(e)}")
 
 
-def run_anova(data, numeric_var, categorical_var):
-    """One-way ANOVA"""
+def run_anova(data, numeric_var, categorical_var, assumptions=True):
+    """One-way ANOVA (assumptions=False skips the Levene check, e.g. for resampling)"""
     try:
-        df = pd.DataFrame(data)
+        df = _coerce(data)
+        values, codes, groups = _numeric_with_groups(df, numeric_var, categorical_var)
 
         # Get groups
-        groups = df[categorical_var].dropna().unique()
         if len(groups) < 2:
             raise ValueError(f"ANOVA requires at least 2 groups, found {len(groups)}")
-
-        # Prepare data for each group
-        group_data = []
-        for group in groups:
-            group_vals = pd.to_numeric(df[df[categorical_var] == group][numeric_var], errors='coerce').dropna().values
-            if len(group_vals) > 0:
-                group_data.append(group_vals)
-
-        # Perform ANOVA
-        f_stat, p_value = stats.f_oneway(*group_data)
-
-        # Calculate statistics
-        all_vals = np.concatenate(group_data)
-        grand_mean = np.mean(all_vals)
+        all_vals, bounds = _split_groups(values, codes, len(groups))
+
+        # Prepare data for each group (views into the group-sorted values)
+        group_data = np.split(all_vals, bounds)
+
+        # Per-group counts, sums and sums of squares in one reduceat pass over the sorted values.
+        # Deviations from each group's first value keep sumsq - sum^2/n well conditioned.
+        starts = np.concatenate(([0], bounds))
+        ns = np.diff(np.append(starts, len(all_vals)))
+        shifts = all_vals[starts]
+        deviations = all_vals - np.repeat(shifts, ns)
+        dev_sums = np.add.reduceat(deviations, starts)
+        dev_sumsq = np.add.reduceat(deviations * deviations, starts)
+
+        means = shifts + dev_sums / ns
+        ss_groups = np.maximum(dev_sumsq - dev_sums * dev_sums / ns, 0.0)
         n_total = len(all_vals)
+        grand_mean = np.dot(ns, means) / n_total
 
         # Sum of squares
-        ss_between = sum(len(g) * (np.mean(g) - grand_mean)**2 for g in group_data)
-        ss_within = sum(np.sum((g - np.mean(g))**2) for g in group_data)
+        ss_between = float(np.dot(ns, (means - grand_mean) ** 2))
+        ss_within = float(ss_groups.sum())
 
         df_between = len(groups) - 1
         df_within = n_total - len(groups)
 
-        ms_between = ss_between / df_between
-        ms_within = ss_within / df_within
+        # Perform ANOVA (same F as stats.f_oneway, from the sums above)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ms_between = ss_between / df_between
+            ms_within = np.float64(ss_within) / df_within
+            f_stat = ms_between / ms_within
+            p_value = stats.f.sf(f_stat, df_between, df_within)
 
-        # Group statistics
-        def calc_stats(values):
-            n = len(values)
-            mean = np.mean(values)
-            std = np.std(values, ddof=1)
-            se = std / np.sqrt(n)
-            ci = 1.96 * se
-            return {
+            # Group statistics
+            stds = np.sqrt(ss_groups / (ns - 1))
+            cis = Z_95 * stds / np.sqrt(ns)
+
+        groups_stats = {
+            str(group): {
                 'n': int(n),
                 'mean': safe_float(mean),
                 'std': safe_float(std),
                 'ci_mean_lower': safe_float(mean - ci),
                 'ci_mean_upper': safe_float(mean + ci)
             }
-
-        groups_stats = {str(group): calc_stats(group_data[i]) for i, group in enumerate(groups)}
+            for group, n, mean, std, ci in zip(groups, ns, means, stds, cis)
+        }
 
         # Assumptions tests
-        _, p_levene = stats.levene(*group_data)
+        assumption_checks = None
+        if assumptions:
+            _, p_levene = stats.levene(*group_data)
+            assumption_checks = {
+                'homogeneity': {
+                    'method': 'Levene',
+                    'p_value': safe_float(p_levene),
+                    'passed': safe_float(p_levene) > 0.05
+                }
+            }
 
         return {
             'test_name': 'ANOVA (One-way)',
@@ -277,13 +425,7 @@ def run_anova(data, numeric_var, categorical_var):
                 'ms_within': safe_float(ms_within)
             },
             'groups': groups_stats,
-            'assumptions': {
-                'homogeneity': {
-                    'method': 'Levene',
-                    'p_value': safe_float(p_levene),
-                    'passed': safe_float(p_levene) > 0.05
-                }
-            },
+            'assumptions': assumption_checks,
             'interpretation': 'Significant difference between groups detected (p < 0.05)' if safe_float(p_value) < 0.05 else 'No significant difference between groups (p ≥ 0.05)'
         }
     except Exception as e:
@@ -293,14 +435,14 @@ def run_anova(data, numeric_var, categorical_var):
 def run_mann_whitney(data, numeric_var, categorical_var):
     """Mann-Whitney U test (Wilcoxon Rank Sum)"""
     try:
-        df = pd.DataFrame(data)
+        df = _coerce(data)
+        values, codes, groups = _numeric_with_groups(df, numeric_var, categorical_var)
 
-        groups = df[categorical_var].dropna().unique()
         if len(groups) != 2:
             raise ValueError(f"Mann-Whitney U test requires exactly 2 groups, found {len(groups)}")
 
-        group1_vals = pd.to_numeric(df[df[categorical_var] == groups[0]][numeric_var], errors='coerce').dropna().values
-        group2_vals = pd.to_numeric(df[df[categorical_var] == groups[1]][numeric_var], errors='coerce').dropna().values
+        group1_vals = values[codes == 0]
+        group2_vals = values[codes == 1]
 
         # Perform Mann-Whitney U test
         u_stat, p_value = stats.mannwhitneyu(group1_vals, group2_vals, alternative='two-sided')
@@ -308,7 +450,7 @@ def run_mann_whitney(data, numeric_var, categorical_var):
         # Calculate effect size (r = Z / sqrt(N)) - handle NaN/Inf
         n1, n2 = len(group1_vals), len(group2_vals)
         if p_value < 1 and p_value > 0:
-            z_score = stats.norm.ppf(1 - p_value / 2)
+            z_score = -ndtri(p_value / 2)
             effect_size_r = safe_float(z_score / np.sqrt(n1 + n2))
         else:
             effect_size_r = 0.0
@@ -341,15 +483,9 @@ def run_mann_whitney(data, numeric_var, categorical_var):
 def run_wilcoxon_signed_rank(data, var1, var2):
     """Wilcoxon Signed-Rank test"""
     try:
-        df = pd.DataFrame(data)
-
-        data_paired = df[[var1, var2]].dropna()
-        var1_vals = pd.to_numeric(data_paired[var1], errors='coerce').values
-        var2_vals = pd.to_numeric(data_paired[var2], errors='coerce').values
+        df = _coerce(data)
 
-        valid_idx = ~(np.isnan(var1_vals) | np.isnan(var2_vals))
-        var1_vals = var1_vals[valid_idx]
-        var2_vals = var2_vals[valid_idx]
+        var1_vals, var2_vals = _numeric_pair(df, var1, var2)
 
         # Perform Wilcoxon Signed-Rank test
         w_stat, p_value = stats.wilcoxon(var1_vals, var2_vals)
@@ -357,7 +493,7 @@ def run_wilcoxon_signed_rank(data, var1, var2):
         # Calculate effect size - handle NaN/Inf
         n = len(var1_vals)
         if p_value < 1 and p_value > 0:
-            z_score = stats.norm.ppf(1 - p_value / 2)
+            z_score = -ndtri(p_value / 2)
             effect_size_r = safe_float(z_score / np.sqrt(n))
         else:
             effect_size_r = 0.0
@@ -383,37 +519,36 @@ def run_wilcoxon_signed_rank(data, var1, var2):
 def run_kruskal_wallis(data, numeric_var, categorical_var):
     """Kruskal-Wallis test"""
     try:
-        df = pd.DataFrame(data)
+        df = _coerce(data)
+        values, codes, groups = _numeric_with_groups(df, numeric_var, categorical_var)
 
-        groups = df[categorical_var].dropna().unique()
         if len(groups) < 2:
             raise ValueError(f"Kruskal-Wallis test requires at least 2 groups, found {len(groups)}")
-
-        group_data = []
-        for group in groups:
-            group_vals = pd.to_numeric(df[df[categorical_var] == group][numeric_var], errors='coerce').dropna().values
-            if len(group_vals) > 0:
-                group_data.append(group_vals)
-
-        # Perform Kruskal-Wallis test
-        h_stat, p_value = stats.kruskal(*group_data)
-
-        # Calculate mean ranks
-        all_vals = np.concatenate(group_data)
-        ranks = stats.rankdata(all_vals)
-
-        groups_stats = {}
-        rank_idx = 0
-        for i, group in enumerate(groups):
-            group_size = len(group_data[i])
-            group_ranks = ranks[rank_idx:rank_idx + group_size]
-            mean_rank = np.mean(group_ranks)
-            groups_stats[str(group)] = {
-                'n': int(group_size),
-                'median': safe_float(np.median(group_data[i])),
+        all_vals, bounds = _split_groups(values, codes, len(groups))
+
+        # Rank once; per-group counts and rank sums come from bincount on the group codes
+        ranks = stats.rankdata(values)
+        ns = np.bincount(codes, minlength=len(groups))
+        rank_sums = np.bincount(codes, weights=ranks, minlength=len(groups))
+        mean_ranks = rank_sums / ns
+
+        # Perform Kruskal-Wallis test (same H and tie correction as stats.kruskal)
+        n_total = len(values)
+        ties = stats.tiecorrect(ranks)
+        if ties == 0:
+            raise ValueError('All numbers are identical in kruskal')
+        h_stat = (12.0 / (n_total * (n_total + 1)) * np.sum(rank_sums ** 2 / ns) - 3 * (n_total + 1)) / ties
+        p_value = stats.chi2.sf(h_stat, len(groups) - 1)
+
+        medians = [np.median(g) for g in np.split(all_vals, bounds)]
+        groups_stats = {
+            str(group): {
+                'n': int(n),
+                'median': safe_float(median),
                 'mean_rank': safe_float(mean_rank)
             }
-            rank_idx += group_size
+            for group, n, median, mean_rank in zip(groups, ns, medians, mean_ranks)
+        }
 
         return {
             'test_name': 'Kruskal-Wallis Test',
@@ -433,20 +568,27 @@ def run_kruskal_wallis(data, numeric_var, categorical_var):
 def run_chi_square(data, var1, var2):
     """Chi-Square test of independence"""
     try:
-        df = pd.DataFrame(data)
-
-        # Create contingency table
-        contingency = pd.crosstab(df[var1], df[var2])
+        df = _coerce(data)
+
+        # Create contingency table (same sorted labels as pd.crosstab): factorize the rows where
+        # both variables are present and count every (row, column) cell with one bincount
+        col1, col2 = df[var1], df[var2]
+        present = (col1.notna() & col2.notna()).to_numpy()
+        codes1, rows = pd.factorize(col1.to_numpy()[present], sort=True)
+        codes2, columns = pd.factorize(col2.to_numpy()[present], sort=True)
+        observed = np.bincount(
+            codes1 * len(columns) + codes2, minlength=len(rows) * len(columns)
+        ).reshape(len(rows), len(columns))
 
         # Perform chi-square test
-        chi2_stat, p_value, df_chi, expected = stats.chi2_contingency(contingency)
+        chi2_stat, p_value, df_chi, expected = stats.chi2_contingency(observed)
 
         # Chi-square contributions
-        chi2_contrib = (contingency.values - expected)**2 / expected
+        chi2_contrib = (observed - expected)**2 / expected
 
         # Safe conversion of nested lists
-        expected_safe = [[safe_float(val) for val in row] for row in expected.tolist()]
-        chi2_contrib_safe = [[safe_float(val) for val in row] for row in chi2_contrib.tolist()]
+        expected_safe = _safe_array(expected).tolist()
+        chi2_contrib_safe = _safe_array(chi2_contrib).tolist()
 
         return {
             'test_name': 'Chi-Square Test',
@@ -457,9 +599,9 @@ def run_chi_square(data, var1, var2):
                 'df': int(df_chi)
             },
             'contingency_table': {
-                'rows': contingency.index.tolist(),
-                'columns': contingency.columns.tolist(),
-                'observed': contingency.values.tolist(),
+                'rows': rows.tolist(),
+                'columns': columns.tolist(),
+                'observed': observed.tolist(),
                 'expected': expected_safe,
                 'chi_square_contributions': chi2_contrib_safe
             },
@@ -469,18 +611,23 @@ def run_chi_square(data, var1, var2):
         raise Exception(f"Error in Chi-Square test: {str(e)}")
 
 
+def _correlation_interpretation(coefficient, p_value):
+    """Interpretation text shared by the correlation tests"""
+    if p_value < 0.001 and coefficient > 0.5:
+        return 'Strong positive correlation detected (p < 0.001)'
+    if p_value < 0.001 and coefficient < -0.5:
+        return 'Strong negative correlation detected (p < 0.001)'
+    if p_value < 0.05:
+        return 'Moderate correlation detected (p < 0.05)'
+    return 'No significant correlation (p ≥ 0.05)'
+
+
 def run_pearson_correlation(data, var1, var2):
     """Pearson Correlation"""
     try:
-        df = pd.DataFrame(data)
-
-        data_clean = df[[var1, var2]].dropna()
-        var1_vals = pd.to_numeric(data_clean[var1], errors='coerce').dropna().values
-        var2_vals = pd.to_numeric(data_clean[var2], errors='coerce').dropna().values
+        df = _coerce(data)
 
-        valid_idx = ~(np.isnan(var1_vals) | np.isnan(var2_vals))
-        var1_vals = var1_vals[valid_idx]
-        var2_vals = var2_vals[valid_idx]
+        var1_vals, var2_vals = _numeric_pair(df, var1, var2)
 
         # Calculate Pearson correlation
         correlation, p_value = stats.pearsonr(var1_vals, var2_vals)
@@ -489,8 +636,8 @@ def run_pearson_correlation(data, var1, var2):
         n = len(var1_vals)
         z = np.arctanh(correlation)
         se = 1 / np.sqrt(n - 3)
-        ci_lower = np.tanh(z - 1.96 * se)
-        ci_upper = np.tanh(z + 1.96 * se)
+        ci_lower = np.tanh(z - Z_95 * se)
+        ci_upper = np.tanh(z + Z_95 * se)
 
         correlation_safe = safe_float(correlation)
         p_value_safe = safe_float(p_value)
@@ -507,10 +654,7 @@ def run_pearson_correlation(data, var1, var2):
                 'ci_upper': ci_upper_safe,
                 'n': int(n)
             },
-            'interpretation': 'Strong positive correlation detected (p < 0.001)' if p_value_safe < 0.001 and correlation_safe > 0.5 else \
-                            'Strong negative correlation detected (p < 0.001)' if p_value_safe < 0.001 and correlation_safe < -0.5 else \
-                            'Moderate correlation detected (p < 0.05)' if p_value_safe < 0.05 else \
-                            'No significant correlation (p ≥ 0.05)'
+            'interpretation': _correlation_interpretation(correlation_safe, p_value_safe)
         }
     except Exception as e:
         raise Exception(f"Error in Pearson correlation: {str(e)}")
@@ -519,25 +663,25 @@ def run_pearson_correlation(data, var1, var2):
 def run_spearman_correlation(data, var1, var2):
     """Spearman Correlation"""
     try:
-        df = pd.DataFrame(data)
+        df = _coerce(data)
 
-        data_clean = df[[var1, var2]].dropna()
-        var1_vals = pd.to_numeric(data_clean[var1], errors='coerce').dropna().values
-        var2_vals = pd.to_numeric(data_clean[var2], errors='coerce').dropna().values
+        var1_vals, var2_vals = _numeric_pair(df, var1, var2)
 
-        valid_idx = ~(np.isnan(var1_vals) | np.isnan(var2_vals))
-        var1_vals = var1_vals[valid_idx]
-        var2_vals = var2_vals[valid_idx]
-
-        # Calculate Spearman correlation
-        correlation, p_value = stats.spearmanr(var1_vals, var2_vals)
+        # Calculate Spearman correlation. When no rows were dropped the ranks are those of the
+        # whole columns, so they are ranked once and reused across tests on the same data.
+        if len(var1_vals) == len(df):
+            ranks1 = _column_ranks(df, var1, var1_vals)
+            ranks2 = _column_ranks(df, var2, var2_vals)
+        else:
+            ranks1, ranks2 = stats.rankdata(var1_vals), stats.rankdata(var2_vals)
+        correlation, p_value = _spearman_from_ranks(ranks1, ranks2)
 
         # Calculate 95% CI for correlation
         n = len(var1_vals)
         z = np.arctanh(correlation)
         se = 1 / np.sqrt(n - 3)
-        ci_lower = np.tanh(z - 1.96 * se)
-        ci_upper = np.tanh(z + 1.96 * se)
+        ci_lower = np.tanh(z - Z_95 * se)
+        ci_upper = np.tanh(z + Z_95 * se)
 
         correlation_safe = safe_float(correlation)
         p_value_safe = safe_float(p_value)
@@ -554,10 +698,7 @@ def run_spearman_correlation(data, var1, var2):
                 'ci_upper': ci_upper_safe,
                 'n': int(n)
             },
-            'interpretation': 'Strong positive correlation detected (p < 0.001)' if p_value_safe < 0.001 and correlation_safe > 0.5 else \
-                            'Strong negative correlation detected (p < 0.001)' if p_value_safe < 0.001 and correlation_safe < -0.5 else \
-                            'Moderate correlation detected (p < 0.05)' if p_value_safe < 0.05 else \
-                            'No significant correlation (p ≥ 0.05)'
+            'interpretation': _correlation_interpretation(correlation_safe, p_value_safe)
         }
     except Exception as e:
         raise Exception(f"Error in Spearman correlation: {str(e)}")
@@ -566,15 +707,9 @@ def run_spearman_correlation(data, var1, var2):
 def run_kendall_correlation(data, var1, var2):
     """Kendall Correlation (Tau)"""
     try:
-        df = pd.DataFrame(data)
+        df = _coerce(data)
 
-        data_clean = df[[var1, var2]].dropna()
-        var1_vals = pd.to_numeric(data_clean[var1], errors='coerce').dropna().values
-        var2_vals = pd.to_numeric(data_clean[var2], errors='coerce').dropna().values
-
-        valid_idx = ~(np.isnan(var1_vals) | np.isnan(var2_vals))
-        var1_vals = var1_vals[valid_idx]
-        var2_vals = var2_vals[valid_idx]
+        var1_vals, var2_vals = _numeric_pair(df, var1, var2)
 
         # Calculate Kendall correlation
         tau, p_value = stats.kendalltau(var1_vals, var2_vals)
@@ -590,10 +725,168 @@ def run_kendall_correlation(data, var1, var2):
                 'p_value': p_value_safe,
                 'n': int(len(var1_vals))
             },
-            'interpretation': 'Strong positive correlation detected (p < 0.001)' if p_value_safe < 0.001 and tau_safe > 0.5 else \
-                            'Strong negative correlation detected (p < 0.001)' if p_value_safe < 0.001 and tau_safe < -0.5 else \
-                            'Moderate correlation detected (p < 0.05)' if p_value_safe < 0.05 else \
-                            'No significant correlation (p ≥ 0.05)'
+            'interpretation': _correlation_interpretation(tau_safe, p_value_safe)
         }
     except Exception as e:
         raise Exception(f"Error in Kendall correlation: {str(e)}")
+
+
+# Below this many rows correlation matrices are computed in float64 whatever dtype is requested
+FLOAT32_MIN_ROWS = 1024
+
+
+def _pairwise_pearson(X, dtype=np.float64):
+    """Pairwise-complete Pearson r and pair counts for the columns of X, from a few matrix products"""
+    valid = ~np.isnan(X)
+    weights = valid.astype(dtype)
+    # Centre on the column means (in float64) first so the one-pass sums below stay well conditioned
+    centered = np.where(valid, X - np.nanmean(X, axis=0), 0.0).astype(dtype, copy=False)
+
+    # The matrix products run in dtype; the small k x k results are combined in float64
+    n = (weights.T @ weights).astype(np.float64)
+    sums = (centered.T @ weights).astype(np.float64)  # sums[i, j]: sum of column i over rows where i and j are both present
+    sumsq = ((centered * centered).T @ weights).astype(np.float64)
+    cross = (centered.T @ centered).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = cross - sums * sums.T / n
+        ss = sumsq - sums * sums / n
+        r = cov / np.sqrt(ss * ss.T)
+    return np.clip(r, -1.0, 1.0), n
+
+
+# Names the single-pair correlation tests report, so matrix pairs match their results
+CORRELATION_TEST_NAMES = {
+    'pearson': 'Pearson Correlation',
+    'spearman': 'Spearman Correlation',
+    'kendall': 'Kendall Correlation (Tau)',
+}
+
+
+def _matrix_pair(method, var1, var2, statistics, coefficient):
+    """One correlation matrix entry, shaped like the matching single-pair test result"""
+    return {
+        'var1': var1,
+        'var2': var2,
+        'test_name': CORRELATION_TEST_NAMES[method],
+        'test_type': f'{method}_correlation',
+        'statistics': statistics,
+        'interpretation': _correlation_interpretation(statistics[coefficient], statistics['p_value'])
+    }
+
+
+def run_correlations_matrix(data, columns, method='pearson', dtype=np.float64):
+    """Pairwise correlations (Pearson, Spearman or Kendall) for every pair of columns in one call"""
+    try:
+        if method not in CORRELATION_TEST_NAMES:
+            raise ValueError(f"Unknown correlation method '{method}'")
+
+        df = _coerce(data)
+        columns = list(dict.fromkeys(columns))
+        X = np.column_stack([
+            pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            for col in columns
+        ])
+        n_pairs = (~np.isnan(X)).astype(np.float64)
+        n_pairs = n_pairs.T @ n_pairs
+        rows, cols = np.triu_indices(len(columns), k=1)
+
+        # Opt-in single precision halves the memory traffic of the matrix products on long columns
+        # (r off by up to ~1e-6); short columns are compute-bound, so they keep full precision
+        if len(X) < FLOAT32_MIN_ROWS:
+            dtype = np.float64
+
+        if method == 'kendall':
+            pairs = []
+            for i, j in zip(rows, cols):
+                both = ~(np.isnan(X[:, i]) | np.isnan(X[:, j]))
+                tau, p_value = stats.kendalltau(X[both, i], X[both, j])
+                pairs.append(_matrix_pair(method, columns[i], columns[j], {
+                    'tau': safe_float(tau),
+                    'p_value': safe_float(p_value),
+                    'n': int(n_pairs[i, j])
+                }, 'tau'))
+        else:
+            if method == 'pearson':
+                r, _ = _pairwise_pearson(X, dtype)
+            elif not np.isnan(X).any():
+                # Complete data: rank every column once, then Pearson on the ranks
+                r, _ = _pairwise_pearson(stats.rankdata(X, axis=0), dtype)
+            else:
+                # Missing values: ranks depend on each pair's complete rows
+                r = np.clip(pd.DataFrame(X).corr(method='spearman').to_numpy(), -1.0, 1.0)
+
+            # p-values (t distribution, as pearsonr/spearmanr) and Fisher-z 95% CIs for all pairs at once
+            r, n = r[rows, cols], n_pairs[rows, cols]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t_stat = r * np.sqrt((n - 2) / (1 - r * r))
+                p_values = 2 * stats.t.sf(np.abs(t_stat), n - 2)
+                z = np.arctanh(r)
+                se = 1 / np.sqrt(n - 3)
+                ci_lower = np.tanh(z - Z_95 * se)
+                ci_upper = np.tanh(z + Z_95 * se)
+
+            pairs = [
+                _matrix_pair(method, columns[i], columns[j], {
+                    'correlation': safe_float(r_ij),
+                    'p_value': safe_float(p_ij),
+                    'ci_lower': safe_float(lo),
+                    'ci_upper': safe_float(hi),
+                    'n': int(n_ij)
+                }, 'correlation')
+                for i, j, r_ij, p_ij, lo, hi, n_ij in zip(rows, cols, r, p_values, ci_lower, ci_upper, n)
+            ]
+
+        return {
+            'test_name': f'{method.capitalize()} Correlation Matrix',
+            'test_type': f'{method}_correlation_matrix',
+            'columns': columns,
+            'pairs': pairs
+        }
+    except Exception as e:
+        raise Exception(f"Error in correlation matrix: {str(e)}")
+
+
+# Tests runnable through run_all, keyed by their result 'test_type': the runner and the
+# request variables it takes, in argument order
+TESTS = {
+    'ttest': (run_ttest, ('numeric', 'categorical')),
+    'paired_ttest': (run_paired_ttest, ('var1', 'var2')),
+    'anova': (run_anova, ('numeric', 'categorical')),
+    'mann_whitney': (run_mann_whitney, ('numeric', 'categorical')),
+    'wilcoxon_signed_rank': (run_wilcoxon_signed_rank, ('var1', 'var2')),
+    'kruskal_wallis': (run_kruskal_wallis, ('numeric', 'categorical')),
+    'chi_square': (run_chi_square, ('var1', 'var2')),
+    'pearson_correlation': (run_pearson_correlation, ('var1', 'var2')),
+    'spearman_correlation': (run_spearman_correlation, ('var1', 'var2')),
+    'kendall_correlation': (run_kendall_correlation, ('var1', 'var2')),
+}
+
+# Below this many rows thread start-up costs more than running the tests one after another
+PARALLEL_MIN_ROWS = int(os.getenv('PARALLEL_MIN_ROWS', 10000))
+
+
+def _run_one(df, test_type, args):
+    try:
+        runner, _ = TESTS[test_type]
+        return runner(df, *args)
+    except Exception as e:
+        return {'test_type': test_type, 'error': str(e)}
+
+
+def run_all(data, spec):
+    """Run several tests on one payload; spec is a list of (test_type, args) pairs, results keep its order"""
+    for test_type, _ in spec:
+        if test_type not in TESTS:
+            raise ValueError(f"Unknown test '{test_type}'")
+
+    # Build the DataFrame once; every test only reads it
+    df = _coerce(data)
+
+    workers = min(len(spec), os.cpu_count() or 1)
+    if len(df) < PARALLEL_MIN_ROWS or workers < 2:
+        return [_run_one(df, test_type, args) for test_type, args in spec]
+
+    # SciPy's compiled routines release the GIL, so threads overlap without copying the data
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_one, df, test_type, args) for test_type, args in spec]
+        return [future.result() for future in futures]
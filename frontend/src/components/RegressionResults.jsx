@@ -204,7 +204,9 @@ export default function RegressionResults({
                   {results.assumptions.normality.passed ? '✓' : '✗'}
                 </div>
                 <div className="assumption-content">
-                  <div className="assumption-name">Normality of Residuals (Shapiro-Wilk)</div>
+                  <div className="assumption-name">
+                    Normality of Residuals ({results.assumptions.normality.method.replace(' (residuals)', '')})
+                  </div>
                   <div className="assumption-details">
                     p-value: {formatNumber(results.assumptions.normality.p_value)}
                   </div>